@@ -1,7 +1,28 @@
-"""Initialize agents module."""
+"""Initialize agents module.
 
-from agents.teaching_agent import TeachingAgent
-from agents.assessment_agent import AssessmentAgent
-from agents.orchestrator_agent import OrchestratorAgent
+Agents are imported lazily (PEP 562), so ``import agents.teaching_agent``
+does not also load the assessment and orchestrator modules.
+"""
+
+from importlib import import_module
+
+_LAZY = {
+    'TeachingAgent': 'agents.teaching_agent',
+    'AssessmentAgent': 'agents.assessment_agent',
+    'OrchestratorAgent': 'agents.orchestrator_agent',
+}
 
 __all__ = ['TeachingAgent', 'AssessmentAgent', 'OrchestratorAgent']
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value  # cache: later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -9,44 +9,109 @@ Flow
 5.  Call MiniMax-M2.5 through the Anthropic SDK.
 6.  Parse the structured JSON reply that follows COMMUNICATION_PROTOCOL.
 7.  Return the diagnostic report to the frontend / loop manager.
+
+``evaluate_many`` runs the same flow for several answers at once, issuing
+the independent MiniMax calls concurrently (``asyncio.gather``).
 """
 
 from __future__ import annotations
 
+import asyncio
+import copy
+import hashlib
 import json
-import uuid
+import logging
+import os
+import sys
+import threading
 import traceback
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 import anthropic
 
-from config.prompts import get_assessment_system_prompt
+try:                                   # optional: faster JSON export
+    import orjson
+
+    def _json_dumps_indented(obj: Any) -> str:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+except ImportError:
+
+    def _json_dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+from config.prompts import cached_system, get_assessment_system_prompt
 from config.config import MiniMaxConfig
+from agents.minimax_client import get_async_client, get_client, run_coroutine
+from knowledge_base.rag_retriever import accepts_where
+from utils.llm_json import safe_json_array_parse as _safe_json_array_parse
+from utils.llm_json import safe_json_parse as _safe_json_parse
+
+logger = logging.getLogger(__name__)
 
 
 # ── helpers ──────────────────────────────────────────────────────────
 
-def _safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
-    """Try to extract a JSON object from an LLM response string."""
-    text = text.strip()
-    if text.startswith("```"):
-        first_nl = text.index("\n") if "\n" in text else 3
-        text = text[first_nl + 1:]
-    if text.endswith("```"):
-        text = text[:-3]
-    text = text.strip()
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(text[start : end + 1])
-            except json.JSONDecodeError:
-                return None
-    return None
+# Replies beyond this size are rejected before parsing — a runaway
+# generation should not cost a full parse of hundreds of KB.
+_MAX_REPLY_CHARS = 256 * 1024
+
+# Identical (system, user) prompts — e.g. a student resubmitting the same
+# answer — are served from an in-process LRU instead of another LLM call.
+_RESPONSE_CACHE_SIZE = 512
+
+
+def _blank_answer_report() -> Dict[str, Any]:
+    """Scored locally — an empty answer needs no LLM round trip."""
+    return {
+        "status": "success",
+        "score_percentage": 0,
+        "diagnostic_report": {
+            "strengths": [],
+            "knowledge_gaps": [],
+            "constructive_feedback": "No answer was submitted for this question.",
+            "misconception_analysis": "",
+        },
+        "next_step_recommendation": {
+            "action": "review",
+            "focus_topics_for_teacher": [],
+        },
+    }
+
+
+# Answers graded per MiniMax call in ``evaluate_many``
+_GRADING_BATCH_SIZE = 5
+
+# User-message templates — compiled once rather than per f-string call
+_HEADER_TMPL = "## Topic: {topic}\n"
+_QUESTION_TMPL = (
+    "### Question{n}\n{question}\n\n\n"
+    "### Student's Answer{n}\n{answer}\n"
+)
+_MARKING_TMPL = "**[MS {i} — {source}]**\n{text}\n"
+_PAPER_TMPL = "**[DSE {year} {paper}]**\n{text}\n"
+_EVALUATE_INSTRUCTION = (
+    "\n---\n"
+    "Evaluate the student's answer against the marking schemes above.  "
+    "Respond with the JSON format specified in your system prompt."
+)
+_EVALUATE_BATCH_INSTRUCTION = (
+    "\n---\n"
+    "Evaluate each of the {n} answers against the marking schemes "
+    "above.  Respond with the JSON array specified in your system prompt."
+)
+
+_BATCH_GRADING_INSTRUCTION = (
+    "\n\nBATCH MODE:\n"
+    "The user message contains {n} numbered question/answer pairs that share "
+    "the marking schemes given.  Evaluate each answer independently and "
+    "respond with a JSON ARRAY of exactly {n} objects, in the same order, "
+    "each following the OUTPUT FORMAT schema above."
+)
 
 
 # ── AssessmentAgent ──────────────────────────────────────────────────
@@ -54,19 +119,29 @@ def _safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
 class AssessmentAgent:
     """Evaluates student responses by sending them + marking schemes to MiniMax."""
 
+    # Oldest results are dropped beyond this, so a long-running server's
+    # memory stays bounded
+    MAX_HISTORY = 1000
+
     def __init__(self, minimax_api_key: str, rag_vectordb):
         self.api_key = minimax_api_key or ""
         self.rag = rag_vectordb
-        self.assessment_history: List[Dict[str, Any]] = []
-
-        self._client: Optional[anthropic.Anthropic] = None
-        if self.api_key:
-            self._client = anthropic.Anthropic(
-                api_key=self.api_key,
-                base_url=MiniMaxConfig.MINIMAX_BASE_URL,
-                timeout=90.0,   # MiniMax-M2.5 extended thinking can take up to ~90s
-            )
-        self._model = MiniMaxConfig.MINIMAX_TEXT_MODEL
+        self.assessment_history: deque[Dict[str, Any]] = deque(maxlen=self.MAX_HISTORY)
+        # assessment_id → result, so lookups don't scan the history list
+        self._assessment_index: Dict[str, Dict[str, Any]] = {}
+
+        # Shared per-key client — one keep-alive pool for all agents
+        self._client: Optional[anthropic.Anthropic] = (
+            get_client(self.api_key) if self.api_key else None
+        )
+        self._model = MiniMaxConfig.MINIMAX_ASSESSMENT_MODEL
+
+        # Independent blocking work (RAG look-ups) fans out here
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="assess")
+
+        # prompt-hash → parsed reply (successful replies only)
+        self._response_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     # ── public API ───────────────────────────────────────────────────
 
@@ -84,8 +159,11 @@ class AssessmentAgent:
         """
 
         # 1. Retrieve relevant marking schemes & papers from RAG ─────
-        marking_chunks = self._retrieve(topic, doc_type="marking_scheme", k=5)
-        paper_chunks   = self._retrieve(topic, doc_type="paper", k=3)
+        #    (the two look-ups are independent, so run them concurrently)
+        fut_marking = self._pool.submit(self._retrieve, topic, "marking_scheme", 5)
+        fut_papers  = self._pool.submit(self._retrieve, topic, "paper", 3)
+        marking_chunks = fut_marking.result()
+        paper_chunks   = fut_papers.result()
 
         # 2. System prompt (communication protocol) ──────────────────
         system_prompt = get_assessment_system_prompt(
@@ -101,16 +179,148 @@ class AssessmentAgent:
         llm_output = self._call_llm(system_prompt, user_message)
 
         # 5. Package ────────────────────────────────────────────────
+        return self._record(
+            topic, difficulty, student_answer, llm_output,
+            len(marking_chunks) + len(paper_chunks),
+        )
+
+    def evaluate_many(
+        self,
+        topic: str,
+        items: List[Dict[str, str]],
+        difficulty: str = "intermediate",
+    ) -> List[Dict[str, Any]]:
+        """Evaluate several ``{"question_text", "student_answer"}`` items.
+
+        The grading calls are independent, so they are issued concurrently
+        and wall time is roughly that of the slowest call.  Results come back
+        in input order, each shaped exactly like an ``evaluate`` result; a
+        call that raises is reported as an error result for that item only.
+        """
+        if not items:
+            return []
+        return run_coroutine(self._evaluate_many_async(topic, items, difficulty))
+
+    async def _evaluate_many_async(
+        self,
+        topic: str,
+        items: List[Dict[str, str]],
+        difficulty: str,
+    ) -> List[Dict[str, Any]]:
+        # Every item shares the topic, so the RAG context is fetched once.
+        # Retrieval is blocking (ChromaDB) — keep it off the event loop.
+        marking_chunks, paper_chunks = await asyncio.gather(
+            asyncio.to_thread(self._retrieve, topic, "marking_scheme", 5),
+            asyncio.to_thread(self._retrieve, topic, "paper", 3),
+        )
+        n_chunks = len(marking_chunks) + len(paper_chunks)
+
+        outputs: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pending: List[int] = []
+        for i, item in enumerate(items):
+            if item.get("student_answer", "").strip():
+                pending.append(i)
+            else:
+                outputs[i] = _blank_answer_report()
+
+        groups = [
+            pending[j : j + _GRADING_BATCH_SIZE]
+            for j in range(0, len(pending), _GRADING_BATCH_SIZE)
+        ]
+        graded_ids = set(pending)   # O(1) membership for the records below
+        # Shared per-loop client — run_coroutine keeps this on one
+        # long-lived loop, so the pool survives across evaluate_many calls
+        client = get_async_client(self.api_key) if self._client else None
+        graded = await asyncio.gather(
+            *(self._grade_group_async(
+                client, topic, [items[i] for i in group], difficulty,
+                marking_chunks, paper_chunks,
+              ) for group in groups),
+            return_exceptions=True,
+        )
+
+        for group, out in zip(groups, graded):
+            if isinstance(out, BaseException):
+                out = [{"status": "error", "error": f"LLM call failed: {out}"} for _ in group]
+            for i, llm_output in zip(group, out):
+                outputs[i] = llm_output
+
+        return [
+            self._record(
+                topic, difficulty, item.get("student_answer", ""), llm_output,
+                n_chunks if i in graded_ids else 0,
+            )
+            for i, (item, llm_output) in enumerate(zip(items, outputs))
+        ]
+
+    async def _grade_group_async(
+        self,
+        client: Optional[anthropic.AsyncAnthropic],
+        topic: str,
+        group: List[Dict[str, str]],
+        difficulty: str,
+        marking_chunks: List[Dict],
+        paper_chunks: List[Dict],
+    ) -> List[Dict[str, Any]]:
+        """Grade a group in one batched call; fall back to one call per item."""
+        if client is not None and len(group) > 1:
+            system_prompt = get_assessment_system_prompt(
+                topic, "(see the numbered answers in the user message)", difficulty,
+            ) + _BATCH_GRADING_INSTRUCTION.format(n=len(group))
+            user_message = self._build_batch_user_message(
+                topic, group, marking_chunks, paper_chunks,
+            )
+            batch = await self._call_llm_batch_async(
+                client, system_prompt, user_message, len(group),
+            )
+            if batch is not None:
+                return batch
+
+        outputs = await asyncio.gather(
+            *(self._call_llm_async(
+                client,
+                get_assessment_system_prompt(
+                    topic, item.get("student_answer", ""), difficulty,
+                ),
+                self._build_user_message(
+                    topic, item.get("question_text", ""),
+                    item.get("student_answer", ""), marking_chunks, paper_chunks,
+                ),
+              ) for item in group),
+            return_exceptions=True,
+        )
+        return [
+            {"status": "error", "error": f"LLM call failed: {out}"}
+            if isinstance(out, BaseException) else out
+            for out in outputs
+        ]
+
+    def _record(
+        self,
+        topic: str,
+        difficulty: str,
+        student_answer: str,
+        llm_output: Dict[str, Any],
+        rag_chunks_used: int,
+    ) -> Dict[str, Any]:
+        """Wrap an LLM reply into an assessment result and append to history."""
+        now = datetime.now()  # one clock read: id and created_at agree
         result = {
-            "assessment_id": f"assess_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
-            "topic": topic,
-            "difficulty": difficulty,
-            "created_at": datetime.now().isoformat(),
+            # 4 random bytes = the same 8 hex chars uuid4().hex[:8] gave
+            "assessment_id": f"assess_{now:%Y%m%d_%H%M%S}_{os.urandom(4).hex()}",
+            # Repeated across the history; share one string per value
+            "topic": sys.intern(topic),
+            "difficulty": sys.intern(difficulty),
+            "created_at": now.isoformat(),
             "student_answer": student_answer,
             "llm_response": llm_output,
-            "rag_chunks_used": len(marking_chunks) + len(paper_chunks),
+            "rag_chunks_used": rag_chunks_used,
         }
+        if len(self.assessment_history) == self.assessment_history.maxlen:
+            evicted = self.assessment_history[0]
+            self._assessment_index.pop(evicted["assessment_id"], None)
         self.assessment_history.append(result)
+        self._assessment_index[result["assessment_id"]] = result
         return result
 
     # ── RAG retrieval ────────────────────────────────────────────────
@@ -120,6 +330,11 @@ class AssessmentAgent:
     ) -> List[Dict[str, Any]]:
         if self.rag is None:
             return []
+        if not accepts_where(self.rag):
+            try:
+                return self.rag.retrieve(topic, k=k)
+            except Exception:
+                return []
         where = {"document_type": doc_type} if doc_type else None
         try:
             return self.rag.retrieve(topic, k=k, where=where)
@@ -139,78 +354,114 @@ class AssessmentAgent:
         marking: List[Dict],
         papers: List[Dict],
     ) -> str:
-        sections: List[str] = []
+        sections: List[str] = [
+            _HEADER_TMPL.format(topic=topic),
+            _QUESTION_TMPL.format(n="", question=question_text, answer=student_answer),
+        ]
+        AssessmentAgent._append_rag_sections(sections, marking, papers)
+        sections.append(_EVALUATE_INSTRUCTION)
+        return "\n\n".join(sections)
 
-        sections.append(f"## Topic: {topic}\n")
-        sections.append(f"### Question\n{question_text}\n")
-        sections.append(f"### Student's Answer\n{student_answer}\n")
+    @staticmethod
+    def _build_batch_user_message(
+        topic: str,
+        group: List[Dict[str, str]],
+        marking: List[Dict],
+        papers: List[Dict],
+    ) -> str:
+        sections: List[str] = [_HEADER_TMPL.format(topic=topic)]
+        sections.extend(
+            _QUESTION_TMPL.format(
+                n=f" {n}",
+                question=item.get("question_text", ""),
+                answer=item.get("student_answer", ""),
+            )
+            for n, item in enumerate(group, 1)
+        )
+        AssessmentAgent._append_rag_sections(sections, marking, papers)
+        sections.append(_EVALUATE_BATCH_INSTRUCTION.format(n=len(group)))
+        return "\n\n".join(sections)
 
+    @staticmethod
+    def _append_rag_sections(
+        sections: List[str], marking: List[Dict], papers: List[Dict],
+    ) -> None:
+        # Blank chunks would only add headers to the prompt
+        marking = [m for m in marking if m.get("text", "").strip()]
+        papers = [p for p in papers if p.get("text", "").strip()]
         if marking:
             sections.append("### Official Marking Schemes (from HKDSE)")
-            for i, m in enumerate(marking, 1):
-                src = m.get("source", "?")
-                sections.append(f"**[MS {i} — {src}]**\n{m.get('text', '')}\n")
+            sections.extend(
+                _MARKING_TMPL.format(i=i, source=m.get("source", "?"), text=m.get("text", ""))
+                for i, m in enumerate(marking, 1)
+            )
 
         if papers:
             sections.append("### Related Past-Paper Content")
-            for i, p in enumerate(papers, 1):
-                meta = p.get("metadata", {})
-                label = f"DSE {meta.get('year', '?')} {meta.get('paper', '')}"
-                sections.append(f"**[{label}]**\n{p.get('text', '')}\n")
-
-        sections.append(
-            "\n---\n"
-            "Evaluate the student's answer against the marking schemes above.  "
-            "Respond with the JSON format specified in your system prompt."
-        )
-        return "\n\n".join(sections)
+            sections.extend(
+                _PAPER_TMPL.format(
+                    year=p.get("metadata", {}).get("year", "?"),
+                    paper=p.get("metadata", {}).get("paper", ""),
+                    text=p.get("text", ""),
+                )
+                for p in papers
+            )
 
     # ── LLM call ─────────────────────────────────────────────────────
 
     def _call_llm(self, system_prompt: str, user_message: str) -> Dict[str, Any]:
         if not self._client:
-            return {
-                "status": "error",
-                "error": (
-                    "No MiniMax API key configured.  "
-                    "Set MINIMAX_API_KEY in your .env file to enable AI assessment."
-                ),
-            }
+            return self._no_api_error()
+
+        key = self._cache_key(system_prompt, user_message)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
 
         try:
             response = self._client.messages.create(
                 model=self._model,
                 max_tokens=4096,
-                system=system_prompt,
+                system=cached_system(system_prompt),
                 messages=[{"role": "user", "content": user_message}],
             )
-
-            # Extract only TextBlocks — skip ThinkingBlock / RedactedThinkingBlock
-            reply_text = ""
-            for block in response.content:
-                if getattr(block, "type", None) == "text":
-                    reply_text += block.text
-
-            parsed = _safe_json_parse(reply_text)
-            if parsed:
-                return parsed
-            else:
-                return {
-                    "status": "success",
-                    "diagnostic_report": {
-                        "strengths": [],
-                        "knowledge_gaps": [],
-                        "constructive_feedback": reply_text,
-                        "misconception_analysis": "",
-                    },
-                    "_raw": True,
-                }
+            return self._cache_put(key, self._parse_reply(response))
 
         except anthropic.AuthenticationError:
+            return self._auth_error()
+        except Exception as e:
             return {
                 "status": "error",
-                "error": "Invalid MiniMax API key.  Check MINIMAX_API_KEY in .env.",
+                "error": f"LLM call failed: {e}",
+                "_traceback": traceback.format_exc(),
             }
+
+    async def _call_llm_async(
+        self,
+        client: Optional[anthropic.AsyncAnthropic],
+        system_prompt: str,
+        user_message: str,
+    ) -> Dict[str, Any]:
+        """Async twin of ``_call_llm`` used by ``evaluate_many``."""
+        if client is None:
+            return self._no_api_error()
+
+        key = self._cache_key(system_prompt, user_message)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await client.messages.create(
+                model=self._model,
+                max_tokens=4096,
+                system=cached_system(system_prompt),
+                messages=[{"role": "user", "content": user_message}],
+            )
+            return self._cache_put(key, self._parse_reply(response))
+
+        except anthropic.AuthenticationError:
+            return self._auth_error()
         except Exception as e:
             return {
                 "status": "error",
@@ -218,7 +469,124 @@ class AssessmentAgent:
                 "_traceback": traceback.format_exc(),
             }
 
+    async def _call_llm_batch_async(
+        self,
+        client: anthropic.AsyncAnthropic,
+        system_prompt: str,
+        user_message: str,
+        n: int,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """One call grading *n* answers.  ``None`` if the reply is unusable.
+
+        The reply is streamed: text deltas are collected as they arrive, and
+        a runaway generation is abandoned as soon as it passes the size
+        bound instead of after the whole body has been downloaded.
+        """
+        limit = _MAX_REPLY_CHARS * n
+        parts: List[str] = []
+        size = 0
+        try:
+            async with client.messages.stream(
+                model=self._model,
+                max_tokens=4096 * n,
+                system=cached_system(system_prompt),
+                messages=[{"role": "user", "content": user_message}],
+            ) as stream:
+                # text_stream yields TextBlock deltas only (no thinking)
+                async for text in stream.text_stream:
+                    parts.append(text)
+                    size += len(text)
+                    if size > limit:
+                        logger.warning("MiniMax batch reply too large (>%d chars) — aborted", limit)
+                        return None
+        except Exception:
+            return None
+        parsed = _safe_json_array_parse("".join(parts))
+        if not parsed or len(parsed) != n or not all(isinstance(p, dict) for p in parsed):
+            return None
+        return parsed
+
+    # ── response cache ───────────────────────────────────────────────
+
+    def _cache_key(self, system_prompt: str, user_message: str) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for part in (self._model, system_prompt, user_message):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._cache_lock:
+            hit = self._response_cache.get(key)
+            if hit is None:
+                return None
+            self._response_cache.move_to_end(key)
+        return copy.deepcopy(hit)
+
+    def _cache_put(self, key: str, reply: Dict[str, Any]) -> Dict[str, Any]:
+        if reply.get("status") == "error" or reply.get("_raw"):
+            return reply
+        with self._cache_lock:
+            self._response_cache[key] = copy.deepcopy(reply)
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+        return reply
+
+    @staticmethod
+    def _parse_reply(response) -> Dict[str, Any]:
+        # Extract only TextBlocks — skip ThinkingBlock / RedactedThinkingBlock
+        reply_text = "".join(
+            block.text for block in response.content
+            if getattr(block, "type", None) == "text"
+        )
+
+        if len(reply_text) > _MAX_REPLY_CHARS:
+            logger.warning("MiniMax reply too large (%d chars) — rejected", len(reply_text))
+            return {
+                "status": "error",
+                "error": f"LLM reply too large ({len(reply_text)} chars).",
+            }
+
+        parsed = _safe_json_parse(reply_text)
+        if parsed:
+            return parsed
+        return {
+            "status": "success",
+            "diagnostic_report": {
+                "strengths": [],
+                "knowledge_gaps": [],
+                "constructive_feedback": reply_text,
+                "misconception_analysis": "",
+            },
+            "_raw": True,
+        }
+
+    @staticmethod
+    def _no_api_error() -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "error": (
+                "No MiniMax API key configured.  "
+                "Set MINIMAX_API_KEY in your .env file to enable AI assessment."
+            ),
+        }
+
+    @staticmethod
+    def _auth_error() -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "error": "Invalid MiniMax API key.  Check MINIMAX_API_KEY in .env.",
+        }
+
     # ── session helpers ──────────────────────────────────────────────
 
     def get_history(self) -> List[Dict[str, Any]]:
-        return self.assessment_history
+        return list(self.assessment_history)
+
+    def get_assessment(self, assessment_id: str) -> Optional[Dict[str, Any]]:
+        return self._assessment_index.get(assessment_id)
+
+    def export_assessment(self, assessment_id: str) -> Optional[str]:
+        result = self._assessment_index.get(assessment_id)
+        return _json_dumps_indented(result) if result else None
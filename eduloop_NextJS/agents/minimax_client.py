@@ -0,0 +1,93 @@
+"""Shared MiniMax (Anthropic-compatible) clients.
+
+Each Anthropic SDK client owns an httpx connection pool.  The agents used
+to build one client apiece, so every agent warmed up its own TCP+TLS
+connections to the same host.  These helpers hand out one client per API
+key instead, so Teaching, Assessment, Orchestrator and the backend's
+paraphrase endpoint all draw from a single keep-alive pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Awaitable, Dict, Optional, TypeVar
+
+import anthropic
+
+from config.config import MiniMaxConfig
+
+# MiniMax-M2.5 extended thinking can take up to ~90s
+_TIMEOUT = 90.0
+
+_lock = threading.Lock()
+_clients: Dict[str, anthropic.Anthropic] = {}
+# httpx async pools are bound to the event loop that opened them, so async
+# clients are shared per loop; entries vanish when the loop is collected.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, anthropic.AsyncAnthropic]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_T = TypeVar("_T")
+# Sync callers (FastAPI worker threads, Streamlit) that need the async
+# client run their coroutines here.  ``asyncio.run`` would start a fresh
+# loop per call — and so a fresh client, pool and TLS handshake each time.
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_client(api_key: str) -> anthropic.Anthropic:
+    """Return the process-wide sync client for *api_key*."""
+    with _lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = anthropic.Anthropic(
+                api_key=api_key,
+                base_url=MiniMaxConfig.MINIMAX_BASE_URL,
+                timeout=_TIMEOUT,
+            )
+            _clients[api_key] = client
+        return client
+
+
+def get_async_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """Return the async client for *api_key* on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(api_key)
+        if client is None:
+            client = anthropic.AsyncAnthropic(
+                api_key=api_key,
+                base_url=MiniMaxConfig.MINIMAX_BASE_URL,
+                timeout=_TIMEOUT,
+            )
+            per_loop[api_key] = client
+        return client
+
+
+def run_coroutine(coro: Awaitable[_T]) -> _T:
+    """Run *coro* on the shared background loop and block for its result.
+
+    Clients from ``get_async_client`` inside *coro* belong to that one
+    long-lived loop, so their connection pools are reused across calls.
+    """
+    global _background_loop
+    with _lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background_loop.run_forever,
+                name="minimax-async", daemon=True,
+            ).start()
+        loop = _background_loop
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def close_clients() -> None:
+    """Close the shared sync clients (e.g. on application shutdown)."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
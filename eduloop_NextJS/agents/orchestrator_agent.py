@@ -22,41 +22,41 @@ Flow
 
 from __future__ import annotations
 
-import json
 import logging
 import os
 import traceback
 from typing import Any, Dict, List, Optional
 
 import anthropic
+from pydantic import BaseModel, ValidationError
 
 from config.config import MiniMaxConfig, AWSConfig
+from config.schemas import AssessmentReply, TeachingReply
+from agents.minimax_client import get_client
+from utils.llm_json import safe_json_parse as _safe_json_parse
 
 logger = logging.getLogger(__name__)
 
 
 # ── helpers ──────────────────────────────────────────────────────────
 
-def _safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
-    """Try to extract a JSON object from an LLM response string."""
-    text = text.strip()
-    if text.startswith("```"):
-        first_nl = text.index("\n") if "\n" in text else 3
-        text = text[first_nl + 1:]
-    if text.endswith("```"):
-        text = text[:-3]
-    text = text.strip()
+def _as_reply(model: type[BaseModel], data: Any) -> BaseModel:
+    """Validate an agent's ``llm_response`` into *model* (empty if malformed)."""
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(text[start : end + 1])
-            except json.JSONDecodeError:
-                return None
-    return None
+        return model.model_validate(data or {})
+    except ValidationError as e:
+        logger.warning("Agent reply did not match %s: %s", model.__name__, e)
+        return model()
+
+
+# Chat heading emoji per lesson content-block type
+_BLOCK_EMOJI = {
+    "introduction": "📖",
+    "concept": "📘",
+    "example": "📝",
+    "common_pitfall": "⚠️",
+    "summary": "✅",
+}
 
 
 # ── Orchestrator System Prompt ────────────────────────────────────────
@@ -126,14 +126,10 @@ class OrchestratorAgent:
             and os.getenv("AWS_BEDROCK_ENABLED", "false").lower() == "true"
         )
 
-        # MiniMax client (fallback routing)
-        self._client: Optional[anthropic.Anthropic] = None
-        if self.api_key:
-            self._client = anthropic.Anthropic(
-                api_key=self.api_key,
-                base_url=MiniMaxConfig.MINIMAX_BASE_URL,
-                timeout=90.0,
-            )
+        # MiniMax client (fallback routing) — shared per key with the agents
+        self._client: Optional[anthropic.Anthropic] = (
+            get_client(self.api_key) if self.api_key else None
+        )
         self._model = MiniMaxConfig.MINIMAX_TEXT_MODEL
 
         logger.info(
@@ -242,10 +238,10 @@ class OrchestratorAgent:
                 messages=messages,
             )
 
-            reply_text = ""
-            for block in response.content:
-                if getattr(block, "type", None) == "text":
-                    reply_text += block.text
+            reply_text = "".join(
+                block.text for block in response.content
+                if getattr(block, "type", None) == "text"
+            )
 
             parsed = _safe_json_parse(reply_text)
             if parsed and "action" in parsed:
@@ -272,28 +268,21 @@ class OrchestratorAgent:
                 level="intermediate",
                 student_profile={},
             )
-            llm = lesson.get("llm_response", {})
+            llm = _as_reply(TeachingReply, lesson.get("llm_response"))
 
             # Build a readable reply from the lesson content blocks
             parts: List[str] = []
             parts.append(f"📘 **Lesson: {teach_topic}**\n")
 
-            for block in llm.get("content_blocks", []):
-                btype = block.get("type", "concept")
-                emoji = {
-                    "introduction": "📖",
-                    "concept": "📘",
-                    "example": "📝",
-                    "common_pitfall": "⚠️",
-                    "summary": "✅",
-                }.get(btype, "📘")
-                parts.append(f"{emoji} **{btype.replace('_', ' ').title()}**\n{block.get('text', '')}")
-
-            advice = llm.get("constructive_advice", "")
+            for block in llm.content_blocks:
+                emoji = _BLOCK_EMOJI.get(block.type, "📘")
+                parts.append(f"{emoji} **{block.type.replace('_', ' ').title()}**\n{block.text}")
+
+            advice = llm.constructive_advice
             if advice:
                 parts.append(f"\n💬 **Tutor's Advice:** {advice}")
 
-            objectives = llm.get("learning_objectives", [])
+            objectives = llm.learning_objectives
             if objectives:
                 obj_str = "\n".join(f"  ✓ {o}" for o in objectives)
                 parts.append(f"\n🎯 **Learning Objectives:**\n{obj_str}")
@@ -332,36 +321,41 @@ class OrchestratorAgent:
                 student_answer=answer,
                 difficulty="intermediate",
             )
-            llm = result.get("llm_response", {})
+            llm = _as_reply(AssessmentReply, result.get("llm_response"))
 
             parts: List[str] = []
             parts.append("📊 **AI Evaluation**\n")
 
-            score = llm.get("score_percentage")
+            score = llm.score_percentage
             if score is not None:
                 parts.append(f"**Score: {score}%**")
 
-            diag = llm.get("diagnostic_report", {})
-            strengths = diag.get("strengths", [])
+            diag = llm.diagnostic_report
+            strengths = diag.strengths
             if strengths:
                 parts.append("✅ **Strengths:**\n" + "\n".join(f"  • {s}" for s in strengths))
 
-            gaps = diag.get("knowledge_gaps", [])
+            gaps = diag.knowledge_gaps
             if gaps:
                 parts.append("⚠️ **Knowledge Gaps:**\n" + "\n".join(f"  • {g}" for g in gaps))
 
-            feedback = diag.get("constructive_feedback", "")
+            feedback = diag.constructive_feedback
             if feedback:
                 parts.append(f"💬 **Feedback:** {feedback}")
 
-            misconception = diag.get("misconception_analysis", "")
+            misconception = diag.misconception_analysis
             if misconception:
                 parts.append(f"🔍 **Misconception:** {misconception}")
 
-            rec = llm.get("next_step_recommendation", {})
-            if rec:
-                action = rec.get("action", "")
-                focus = rec.get("focus_topics_for_teacher", rec.get("focus_topics", []))
+            rec = llm.next_step_recommendation
+            # Only when the model actually sent one (an empty {} is skipped)
+            if rec is not None and (rec.model_fields_set or rec.model_extra):
+                action = rec.action
+                focus = (
+                    rec.focus_topics_for_teacher
+                    if "focus_topics_for_teacher" in rec.model_fields_set
+                    else (rec.model_extra or {}).get("focus_topics", [])
+                )
                 parts.append(f"\n📌 **Next Step:** {action} — focus on: {', '.join(focus)}")
 
             return {
@@ -13,44 +13,126 @@ Flow
 
 from __future__ import annotations
 
+import asyncio
 import json
-import uuid
+import os
+import sys
+import tempfile
 import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import anthropic                                  # MiniMax Anthropic-compat SDK
 
-from config.prompts import get_teaching_system_prompt
+from config.prompts import cached_system, get_teaching_system_prompt
 from config.config import MiniMaxConfig
-
-
-# ── helpers ──────────────────────────────────────────────────────────
-
-def _safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
-    """Try to extract a JSON object from an LLM response string."""
-    # The model *should* respond with pure JSON, but sometimes wraps it
-    # in markdown fences or adds preamble text.
-    text = text.strip()
-    # Strip markdown code fences
-    if text.startswith("```"):
-        first_nl = text.index("\n") if "\n" in text else 3
-        text = text[first_nl + 1:]
-    if text.endswith("```"):
-        text = text[:-3]
-    text = text.strip()
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        # Attempt to find the first '{' and last '}'
-        start = text.find("{")
-        end = text.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            try:
-                return json.loads(text[start : end + 1])
-            except json.JSONDecodeError:
-                return None
-    return None
+from agents.minimax_client import get_async_client, get_client
+from knowledge_base.rag_retriever import accepts_where
+from utils.llm_json import safe_json_array_parse as _safe_json_array_parse
+from utils.llm_json import safe_json_parse as _safe_json_parse
+
+try:                                   # optional: faster JSON export
+    import orjson
+
+    def _json_dumps_indented(obj: Any) -> str:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+        ).decode()
+except ImportError:
+
+    def _json_dumps_indented(obj: Any) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+# ── prompts ──────────────────────────────────────────────────────────
+
+_LATEX_FORMATTER_RULES = (
+    "You are a HKDSE Mathematics typesetter. "
+    "You receive raw OCR-extracted text from scanned past-paper PDFs.\n\n"
+    "Your tasks:\n"
+    "1. Clean ALL OCR artefacts (misread characters, broken ligatures, "
+    "stray symbols, garbled Unicode).\n"
+    "2. Convert EVERY mathematical expression — no matter how simple — "
+    "into LaTeX:\n"
+    "   • Inline: $expression$   (variables, numbers with operators, "
+    "small fractions)\n"
+    "   • Display/block: $$expression$$   (equations, formulas, "
+    "solutions)\n"
+    "   Even single variables like x or constants like 3 that appear "
+    "in a mathematical context MUST be wrapped in $...$.\n"
+    "3. If the OCR text contains an answer, solution, or correct "
+    "option (e.g. 'A', 'x = 2'), separate it out.\n"
+    "4. Preserve original question wording and numbering exactly.\n\n"
+)
+
+_LATEX_REFERENCE = (
+    "LaTeX reference:\n"
+    "  $ax^2 + bx + c = 0$, $$x = \\frac{-b \\pm \\sqrt{b^2-4ac}}{2a}$$\n"
+    "  $\\frac{3}{4}$, $x^n$, $x_1$, $\\sin\\theta$, $\\log_a x$, $|x|$\n"
+    "  $$\\begin{pmatrix} a & b \\\\ c & d \\end{pmatrix}$$\n\n"
+    "IMPORTANT: Wrap ALL math in LaTeX — even simple items like "
+    "'x = 2' → '$x = 2$'. Never leave bare math."
+)
+
+_LATEX_FORMATTER_PROMPT = (
+    _LATEX_FORMATTER_RULES
+    + "Return ONLY a JSON object with two keys:\n"
+    '  {"question": "<cleaned question in markdown+LaTeX>", '
+    '"answer": "<answer/solution or empty string>"}\n\n'
+    + _LATEX_REFERENCE
+)
+
+# Batched variant: N questions in, one JSON array of N objects out.
+_LATEX_BATCH_PROMPT = (
+    _LATEX_FORMATTER_RULES
+    + "You will receive several numbered questions.  Return ONLY a JSON "
+    "array with exactly one object per question, in the same order:\n"
+    '  [{"question": "<cleaned question in markdown+LaTeX>", '
+    '"answer": "<answer/solution or empty string>"}, ...]\n\n'
+    + _LATEX_REFERENCE
+)
+
+# ── lesson user-message templates ────────────────────────────────────
+
+_HEADER_TMPL = "## Topic: {topic}  |  Level: {level}\n"
+_CURRICULUM_HEADING = "### Curriculum Material (from HKDSE syllabus PDFs)"
+_CURRICULUM_TMPL = "**[Chunk {n} — {source}]**\n{text}\n"
+_PAPERS_HEADING = "### Past-Paper Questions"
+_PAPER_TMPL = "**[DSE {year} {paper} — {source}]**\n{text}\n"
+_MARKING_HEADING = "### Marking Schemes"
+_MARKING_TMPL = "**[MS — {source}]**\n{text}\n"
+_LESSON_INSTRUCTION = (
+    "\n---\n"
+    "Using the DSE material above, generate the lesson JSON as specified "
+    "in your system prompt.  Ensure every content_block is grounded in the "
+    "retrieved material.  Do NOT invent questions that aren't in the data."
+)
+
+
+# Output budget per lesson level.  MiniMax-M2.5 spends part of this on
+# thinking before the JSON, so foundational lessons (fewer, shorter
+# blocks) get a smaller cap rather than the full 4096 every time.
+_LESSON_MAX_TOKENS = {
+    "foundational": 3072,
+    "intermediate": 4096,
+    "advanced": 4096,
+}
+_DEFAULT_MAX_TOKENS = 4096
+
+# Process-wide pool for the blocking RAG look-ups of sync callers; shared
+# by every TeachingAgent so each instance doesn't spawn its own threads
+_IO_POOL = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 2),
+    thread_name_prefix="teaching-io",
+)
+
+_NO_API_ERROR = (
+    "No MiniMax API key configured.  "
+    "Set MINIMAX_API_KEY in your .env file to enable AI-generated lessons.  "
+    "Showing raw RAG data instead."
+)
 
 
 # ── TeachingAgent ────────────────────────────────────────────────────
@@ -58,19 +140,20 @@ def _safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
 class TeachingAgent:
     """Generates personalised lessons by sending RAG context to MiniMax-M2.5."""
 
+    # Oldest lessons are dropped beyond this (and from the id index)
+    MAX_HISTORY = 1000
+
     def __init__(self, minimax_api_key: str, rag_vectordb):
         self.api_key = minimax_api_key or ""
         self.rag = rag_vectordb
-        self.session_lessons: List[Dict[str, Any]] = []
-
-        # Anthropic client pointing at MiniMax's endpoint
-        self._client: Optional[anthropic.Anthropic] = None
-        if self.api_key:
-            self._client = anthropic.Anthropic(
-                api_key=self.api_key,
-                base_url=MiniMaxConfig.MINIMAX_BASE_URL,
-                timeout=90.0,   # MiniMax-M2.5 extended thinking can take up to ~90s
-            )
+        self.session_lessons: deque[Dict[str, Any]] = deque(maxlen=self.MAX_HISTORY)
+        self._lessons_by_id: Dict[str, Dict[str, Any]] = {}
+
+        # Anthropic client pointing at MiniMax's endpoint — shared per key,
+        # so all agents draw from one keep-alive connection pool
+        self._client: Optional[anthropic.Anthropic] = (
+            get_client(self.api_key) if self.api_key else None
+        )
         self._model = MiniMaxConfig.MINIMAX_TEXT_MODEL  # e.g. "MiniMax-M2.5"
 
     # ── public API ───────────────────────────────────────────────────
@@ -80,42 +163,72 @@ class TeachingAgent:
         topic: str,
         level: str,
         student_profile: Dict[str, Any],
+        on_text: Optional[Callable[[str], None]] = None,
     ) -> Dict[str, Any]:
         """Generate a full lesson by calling MiniMax with RAG context.
 
         Returns a dict whose ``"content"`` follows the communication-protocol
-        schema defined in ``config/prompts.py``.
+        schema defined in ``config/prompts.py``.  When ``on_text`` is given
+        the reply is streamed and each text delta is passed to it as it
+        arrives, so a UI can show progress from the first token.
         """
 
-        # 1. Retrieve RAG context ────────────────────────────────────
-        curriculum_chunks = self._retrieve(topic, doc_type="curriculum", k=5)
-        paper_chunks      = self._retrieve(topic, doc_type="paper", k=5)
-        marking_chunks    = self._retrieve(topic, doc_type="marking_scheme", k=3)
-        all_chunks = curriculum_chunks + paper_chunks + marking_chunks
+        # 1. Retrieve RAG context (the three look-ups overlap) ────────
+        fut_curriculum = _IO_POOL.submit(self._retrieve, topic, "curriculum", 5)
+        fut_papers     = _IO_POOL.submit(self._retrieve, topic, "paper", 5)
+        fut_marking    = _IO_POOL.submit(self._retrieve, topic, "marking_scheme", 3)
+        curriculum_chunks = fut_curriculum.result()
+        paper_chunks      = fut_papers.result()
+        marking_chunks    = fut_marking.result()
+
+        # 2–4. System prompt + user message ─────────────────────────
+        system_prompt, user_message = self._prepare_prompts(
+            topic, level, student_profile,
+            curriculum_chunks, paper_chunks, marking_chunks,
+        )
 
-        # 2. Build the student context for the system prompt ─────────
-        student_context = {
-            "level": level,
-            "learning_style": student_profile.get("learning_style", "visual"),
-            "previous_knowledge_gaps": student_profile.get("knowledge_gaps", []),
-            "preferred_language": student_profile.get("language", "English"),
-        }
+        # 5. Call MiniMax via Anthropic SDK ──────────────────────────
+        llm_output = self._call_llm(
+            system_prompt, user_message,
+            max_tokens=_LESSON_MAX_TOKENS.get(level.lower(), _DEFAULT_MAX_TOKENS),
+            on_text=on_text,
+        )
 
-        # 3. System prompt (from the communication protocol) ─────────
-        system_prompt = get_teaching_system_prompt(topic, level, student_context)
+        # 6. Package into lesson dict ────────────────────────────────
+        all_chunks = curriculum_chunks + paper_chunks + marking_chunks
+        lesson = self._package_lesson(topic, level, llm_output, all_chunks)
+        self._remember(lesson)
+        return lesson
 
-        # 4. User message = RAG context + instruction ────────────────
-        user_message = self._build_user_message(topic, level,
-                                                 curriculum_chunks,
-                                                 paper_chunks,
-                                                 marking_chunks)
+    async def generate_lesson_async(
+        self,
+        topic: str,
+        level: str,
+        student_profile: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Async twin of ``generate_lesson`` for callers on an event loop.
 
-        # 5. Call MiniMax via Anthropic SDK ──────────────────────────
-        llm_output = self._call_llm(system_prompt, user_message)
+        The three RAG look-ups run concurrently in worker threads and the
+        MiniMax call is awaited, so no thread sits blocked for the length
+        of the generation.
+        """
+        curriculum_chunks, paper_chunks, marking_chunks = await asyncio.gather(
+            asyncio.to_thread(self._retrieve, topic, "curriculum", 5),
+            asyncio.to_thread(self._retrieve, topic, "paper", 5),
+            asyncio.to_thread(self._retrieve, topic, "marking_scheme", 3),
+        )
+        system_prompt, user_message = self._prepare_prompts(
+            topic, level, student_profile,
+            curriculum_chunks, paper_chunks, marking_chunks,
+        )
+        llm_output = await self._call_llm_async(
+            system_prompt, user_message,
+            max_tokens=_LESSON_MAX_TOKENS.get(level.lower(), _DEFAULT_MAX_TOKENS),
+        )
 
-        # 6. Package into lesson dict ────────────────────────────────
+        all_chunks = curriculum_chunks + paper_chunks + marking_chunks
         lesson = self._package_lesson(topic, level, llm_output, all_chunks)
-        self.session_lessons.append(lesson)
+        self._remember(lesson)
         return lesson
 
     # ── RAG retrieval ────────────────────────────────────────────────
@@ -125,6 +238,11 @@ class TeachingAgent:
     ) -> List[Dict[str, Any]]:
         if self.rag is None:
             return []
+        if not accepts_where(self.rag):
+            try:
+                return self.rag.retrieve(topic, k=k)
+            except Exception:
+                return []
         where = {"document_type": doc_type} if doc_type else None
         try:
             return self.rag.retrieve(topic, k=k, where=where)
@@ -136,6 +254,34 @@ class TeachingAgent:
 
     # ── prompt construction ──────────────────────────────────────────
 
+    def _prepare_prompts(
+        self,
+        topic: str,
+        level: str,
+        student_profile: Dict[str, Any],
+        curriculum: List[Dict],
+        papers: List[Dict],
+        marking: List[Dict],
+    ) -> tuple[str, str]:
+        """Return ``(system_prompt, user_message)`` for a lesson request."""
+        # User message = RAG context + instruction
+        user_message = self._build_user_message(topic, level, curriculum, papers, marking)
+        if not self._client:
+            # The no-API fallback only echoes the RAG context, so skip
+            # rendering a system prompt that would never be sent.
+            return "", user_message
+
+        # Student context for the system prompt
+        student_context = {
+            "level": level,
+            "learning_style": student_profile.get("learning_style", "visual"),
+            "previous_knowledge_gaps": student_profile.get("knowledge_gaps", []),
+            "preferred_language": student_profile.get("language", "English"),
+        }
+        # System prompt (from the communication protocol)
+        system_prompt = get_teaching_system_prompt(topic, level, student_context)
+        return system_prompt, user_message
+
     @staticmethod
     def _build_user_message(
         topic: str,
@@ -145,81 +291,101 @@ class TeachingAgent:
         marking: List[Dict],
     ) -> str:
         """Pack all RAG chunks into a structured user message."""
-        sections: List[str] = []
+        # Blank chunks (e.g. image-only PDF pages) only add headers and
+        # separators to the prompt — drop them, and their section if empty
+        curriculum = [c for c in curriculum if c.get("text", "").strip()]
+        papers = [p for p in papers if p.get("text", "").strip()]
+        marking = [m for m in marking if m.get("text", "").strip()]
 
-        sections.append(f"## Topic: {topic}  |  Level: {level}\n")
+        sections: List[str] = [_HEADER_TMPL.format(topic=topic, level=level)]
 
         # Curriculum context
         if curriculum:
-            sections.append("### Curriculum Material (from HKDSE syllabus PDFs)")
-            for i, c in enumerate(curriculum, 1):
-                src = c.get("source", "?")
-                sections.append(f"**[Chunk {i} — {src}]**\n{c.get('text', '')}\n")
+            sections.append(_CURRICULUM_HEADING)
+            sections.extend(
+                _CURRICULUM_TMPL.format(n=i, source=c.get("source", "?"), text=c.get("text", ""))
+                for i, c in enumerate(curriculum, 1)
+            )
 
         # Past-paper questions
         if papers:
-            sections.append("### Past-Paper Questions")
-            for i, p in enumerate(papers, 1):
-                meta = p.get("metadata", {})
-                label = f"DSE {meta.get('year', '?')} {meta.get('paper', '')}"
-                sections.append(f"**[{label} — {p.get('source', '')}]**\n{p.get('text', '')}\n")
+            sections.append(_PAPERS_HEADING)
+            sections.extend(
+                _PAPER_TMPL.format(
+                    year=p.get("metadata", {}).get("year", "?"),
+                    paper=p.get("metadata", {}).get("paper", ""),
+                    source=p.get("source", ""),
+                    text=p.get("text", ""),
+                )
+                for p in papers
+            )
 
         # Marking schemes
         if marking:
-            sections.append("### Marking Schemes")
-            for i, m in enumerate(marking, 1):
-                sections.append(f"**[MS — {m.get('source', '')}]**\n{m.get('text', '')}\n")
-
-        sections.append(
-            "\n---\n"
-            "Using the DSE material above, generate the lesson JSON as specified "
-            "in your system prompt.  Ensure every content_block is grounded in the "
-            "retrieved material.  Do NOT invent questions that aren't in the data."
-        )
+            sections.append(_MARKING_HEADING)
+            sections.extend(
+                _MARKING_TMPL.format(source=m.get("source", ""), text=m.get("text", ""))
+                for m in marking
+            )
+
+        sections.append(_LESSON_INSTRUCTION)
         return "\n\n".join(sections)
 
     # ── LLM call ─────────────────────────────────────────────────────
 
-    def _call_llm(self, system_prompt: str, user_message: str) -> Dict[str, Any]:
+    def _call_llm(
+        self, system_prompt: str, user_message: str,
+        max_tokens: int = _DEFAULT_MAX_TOKENS,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, Any]:
         """Call MiniMax-M2.5 via the Anthropic SDK.  Gracefully degrade."""
         if not self._client:
             return self._fallback_no_api(user_message)
 
+        request = dict(
+            model=self._model,
+            max_tokens=max_tokens,
+            system=cached_system(system_prompt),
+            messages=[{"role": "user", "content": user_message}],
+        )
         try:
-            response = self._client.messages.create(
-                model=self._model,
-                max_tokens=4096,
-                system=system_prompt,
-                messages=[{"role": "user", "content": user_message}],
-            )
-
-            # Extract only TextBlocks — skip ThinkingBlock / RedactedThinkingBlock
-            reply_text = ""
-            for block in response.content:
-                if getattr(block, "type", None) == "text":
-                    reply_text += block.text
-
-            parsed = _safe_json_parse(reply_text)
-            if parsed:
-                return parsed
+            if on_text is None:
+                response = self._client.messages.create(**request)
             else:
-                # LLM answered but not valid JSON — wrap its text
-                return {
-                    "status": "success",
-                    "content_blocks": [
-                        {"type": "concept", "text": reply_text}
-                    ],
-                    "constructive_advice": "",
-                    "learning_objectives": [],
-                    "suggested_questions_for_assessment": [],
-                    "_raw": True,
-                }
+                with self._client.messages.stream(**request) as stream:
+                    for delta in stream.text_stream:
+                        on_text(delta)
+                    response = stream.get_final_message()
+            return self._parse_reply(response)
 
         except anthropic.AuthenticationError:
+            return self._auth_error()
+        except Exception as e:
             return {
                 "status": "error",
-                "error": "Invalid MiniMax API key. Set MINIMAX_API_KEY in your .env file.",
+                "error": f"LLM call failed: {e}",
+                "_traceback": traceback.format_exc(),
             }
+
+    async def _call_llm_async(
+        self, system_prompt: str, user_message: str,
+        max_tokens: int = _DEFAULT_MAX_TOKENS,
+    ) -> Dict[str, Any]:
+        """Async twin of ``_call_llm``."""
+        if not self._client:
+            return self._fallback_no_api(user_message)
+
+        try:
+            response = await get_async_client(self.api_key).messages.create(
+                model=self._model,
+                max_tokens=max_tokens,
+                system=cached_system(system_prompt),
+                messages=[{"role": "user", "content": user_message}],
+            )
+            return self._parse_reply(response)
+
+        except anthropic.AuthenticationError:
+            return self._auth_error()
         except Exception as e:
             return {
                 "status": "error",
@@ -227,16 +393,42 @@ class TeachingAgent:
                 "_traceback": traceback.format_exc(),
             }
 
+    @staticmethod
+    def _parse_reply(response) -> Dict[str, Any]:
+        # Extract only TextBlocks — skip ThinkingBlock / RedactedThinkingBlock
+        reply_text = "".join(
+            block.text for block in response.content
+            if getattr(block, "type", None) == "text"
+        )
+
+        parsed = _safe_json_parse(reply_text)
+        if parsed:
+            return parsed
+        # LLM answered but not valid JSON — wrap its text
+        return {
+            "status": "success",
+            "content_blocks": [
+                {"type": "concept", "text": reply_text}
+            ],
+            "constructive_advice": "",
+            "learning_objectives": [],
+            "suggested_questions_for_assessment": [],
+            "_raw": True,
+        }
+
+    @staticmethod
+    def _auth_error() -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "error": "Invalid MiniMax API key. Set MINIMAX_API_KEY in your .env file.",
+        }
+
     @staticmethod
     def _fallback_no_api(user_message: str) -> Dict[str, Any]:
         """Returned when no API key is configured — shows RAG context only."""
         return {
             "status": "error",
-            "error": (
-                "No MiniMax API key configured.  "
-                "Set MINIMAX_API_KEY in your .env file to enable AI-generated lessons.  "
-                "Showing raw RAG data instead."
-            ),
+            "error": _NO_API_ERROR,
             "content_blocks": [
                 {"type": "concept", "text": user_message},
             ],
@@ -255,11 +447,13 @@ class TeachingAgent:
         all_chunks: List[Dict],
     ) -> Dict[str, Any]:
         """Wrap LLM output + metadata into the final lesson dict."""
+        now = datetime.now()  # one clock read: id and created_at agree
         return {
-            "lesson_id": f"lesson_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}",
-            "topic": topic,
-            "level": level,
-            "created_at": datetime.now().isoformat(),
+            "lesson_id": f"lesson_{now:%Y%m%d_%H%M%S}_{os.urandom(4).hex()}",
+            # Repeated across the history; share one string per value
+            "topic": sys.intern(topic),
+            "level": sys.intern(level),
+            "created_at": now.isoformat(),
             "llm_response": llm_output,                       # ← protocol-shaped JSON
             "dse_references": list({c.get("source", "?") for c in all_chunks}),
             "rag_chunks_used": len(all_chunks),
@@ -277,33 +471,7 @@ class TeachingAgent:
         if not self._client or not raw_text.strip():
             return fallback
 
-        system = (
-            "You are a HKDSE Mathematics typesetter. "
-            "You receive raw OCR-extracted text from scanned past-paper PDFs.\n\n"
-            "Your tasks:\n"
-            "1. Clean ALL OCR artefacts (misread characters, broken ligatures, "
-            "stray symbols, garbled Unicode).\n"
-            "2. Convert EVERY mathematical expression — no matter how simple — "
-            "into LaTeX:\n"
-            "   • Inline: $expression$   (variables, numbers with operators, "
-            "small fractions)\n"
-            "   • Display/block: $$expression$$   (equations, formulas, "
-            "solutions)\n"
-            "   Even single variables like x or constants like 3 that appear "
-            "in a mathematical context MUST be wrapped in $...$.\n"
-            "3. If the OCR text contains an answer, solution, or correct "
-            "option (e.g. 'A', 'x = 2'), separate it out.\n"
-            "4. Preserve original question wording and numbering exactly.\n\n"
-            "Return ONLY a JSON object with two keys:\n"
-            '  {"question": "<cleaned question in markdown+LaTeX>", '
-            '"answer": "<answer/solution or empty string>"}\n\n'
-            "LaTeX reference:\n"
-            "  $ax^2 + bx + c = 0$, $$x = \\frac{-b \\pm \\sqrt{b^2-4ac}}{2a}$$\n"
-            "  $\\frac{3}{4}$, $x^n$, $x_1$, $\\sin\\theta$, $\\log_a x$, $|x|$\n"
-            "  $$\\begin{pmatrix} a & b \\\\ c & d \\end{pmatrix}$$\n\n"
-            "IMPORTANT: Wrap ALL math in LaTeX — even simple items like "
-            "'x = 2' → '$x = 2$'. Never leave bare math."
-        )
+        system = _LATEX_FORMATTER_PROMPT
 
         try:
             response = self._client.messages.create(
@@ -329,14 +497,111 @@ class TeachingAgent:
         except Exception:
             return fallback
 
+    def format_question_latex_batch(
+        self, items: List[tuple[str, str]],
+    ) -> List[dict]:
+        """Format several ``(raw_text, topic)`` pairs with a single MiniMax call.
+
+        The model is asked for a JSON array with one ``{"question", "answer"}``
+        object per input, so N questions cost one round trip instead of N.
+        Any slot the batch reply fails to fill falls back to
+        ``format_question_latex`` for that item alone.
+        """
+        results: List[Optional[dict]] = [
+            None if raw.strip() else {"question": raw, "answer": ""}
+            for raw, _ in items
+        ]
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results  # type: ignore[return-value]
+        if not self._client:
+            return [{"question": raw, "answer": ""} for raw, _ in items]
+
+        if len(pending) > 1:
+            user_message = "\n\n".join(
+                f"### Question {n} (Topic: {items[i][1]})\n\nRaw OCR text:\n\n{items[i][0]}"
+                for n, i in enumerate(pending, 1)
+            )
+            try:
+                response = self._client.messages.create(
+                    model=self._model,
+                    max_tokens=2048 * len(pending),
+                    system=_LATEX_BATCH_PROMPT,
+                    messages=[{"role": "user", "content": user_message}],
+                )
+                reply = "".join(
+                    b.text for b in response.content
+                    if getattr(b, "type", None) == "text"
+                )
+                parsed = _safe_json_array_parse(reply) or []
+            except Exception:
+                parsed = []
+
+            if len(parsed) == len(pending):
+                for i, entry in zip(pending, parsed):
+                    if isinstance(entry, dict) and entry.get("question"):
+                        results[i] = {
+                            "question": entry["question"],
+                            "answer": entry.get("answer", "") or "",
+                        }
+
+        # Single-question path for anything the batch could not fill
+        for i, r in enumerate(results):
+            if r is None:
+                results[i] = self.format_question_latex(*items[i])
+        return results  # type: ignore[return-value]
+
     # ── session helpers ──────────────────────────────────────────────
 
     def get_lesson_history(self) -> List[Dict[str, Any]]:
-        return self.session_lessons
+        return list(self.session_lessons)
+
+    def _remember(self, lesson: Dict[str, Any]) -> None:
+        if len(self.session_lessons) == self.session_lessons.maxlen:
+            evicted = self.session_lessons[0]
+            self._lessons_by_id.pop(evicted["lesson_id"], None)
+        self.session_lessons.append(lesson)
+        self._lessons_by_id[lesson["lesson_id"]] = lesson
 
     def export_lesson(self, lesson_id: str) -> Optional[str]:
-        lesson = next(
-            (l for l in self.session_lessons if l["lesson_id"] == lesson_id),
-            None,
-        )
-        return json.dumps(lesson, indent=2) if lesson else None
+        lesson = self._lessons_by_id.get(lesson_id)
+        return _json_dumps_indented(lesson) if lesson else None
+
+    def export_lessons(self, lesson_ids: List[str], dirpath: str) -> List[str]:
+        """Write each known lesson to ``<dirpath>/<lesson_id>.json``.
+
+        Every file is written to a temp file and renamed into place, so a
+        reader never sees a partial export; the directory is fsynced once
+        at the end rather than once per lesson.  A failed write removes its
+        temp file and re-raises.  Files are created owner-only (0600, as
+        ``NamedTemporaryFile`` does) since lessons carry student context.
+        Unknown ids are skipped.  Returns the paths written.
+        """
+        os.makedirs(dirpath, exist_ok=True)
+        written: List[str] = []
+        for lesson_id in lesson_ids:
+            lesson = self._lessons_by_id.get(lesson_id)
+            if lesson is None:
+                continue
+            final = os.path.join(dirpath, f"{lesson_id}.json")
+            tmp_path = None
+            try:
+                with tempfile.NamedTemporaryFile(
+                    "w", encoding="utf-8", dir=dirpath, suffix=".tmp", delete=False,
+                ) as tmp:
+                    tmp_path = tmp.name
+                    tmp.write(_json_dumps_indented(lesson))
+                os.replace(tmp_path, final)
+            except BaseException:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+            written.append(final)
+
+        if written and hasattr(os, "O_DIRECTORY"):
+            fd = os.open(dirpath, os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return written
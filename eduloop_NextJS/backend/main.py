@@ -20,14 +20,25 @@ os.chdir(_ROOT)
 from dotenv import load_dotenv
 load_dotenv(_ROOT / ".env")
 
+import hashlib
+import re
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Any
+from typing import Any, Literal
 
 from agents.teaching_agent import TeachingAgent
 from agents.assessment_agent import AssessmentAgent
 from agents.orchestrator_agent import OrchestratorAgent
+from agents.minimax_client import close_clients
 from core.bedrock_orchestrator import BedrockOrchestrator
 from knowledge_base.rag_retriever import DSERetriever
 from config.config import DatabaseConfig, MiniMaxConfig, AWSConfig
@@ -56,7 +67,6 @@ bedrock_orchestrator: BedrockOrchestrator | None = None
 async def startup() -> None:
     global rag, teaching_agent, assessment_agent, orchestrator_agent, bedrock_orchestrator
 
-    import os
     os.environ.setdefault("HF_HUB_OFFLINE", "1")          # Skip HF network check
     os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
 
@@ -95,6 +105,13 @@ async def startup() -> None:
     print(f"✅  EduLoop API ready — MiniMax key {'SET' if api_key else 'NOT SET'}, Bedrock {'ENABLED' if bedrock_enabled else 'DISABLED'}")
 
 
+@app.on_event("shutdown")
+def shutdown() -> None:
+    # Release pooled keep-alive connections (MiniMax REST + SDK clients)
+    _http.close()
+    close_clients()
+
+
 # ── Request models ─────────────────────────────────────────────────────
 class TeachRequest(BaseModel):
     topic: str
@@ -109,11 +126,26 @@ class AssessRequest(BaseModel):
     difficulty: str = "intermediate"
 
 
+class AnswerItem(BaseModel):
+    question_text: str
+    student_answer: str
+
+
+class AssessBatchRequest(BaseModel):
+    topic: str
+    items: list[AnswerItem]
+    difficulty: str = "intermediate"
+
+
 class FormatRequest(BaseModel):
     raw_text: str
     topic: str
 
 
+# Questions per MiniMax call in /api/format-questions
+_FORMAT_BATCH_SIZE = 4
+
+
 class ChatMessage(BaseModel):
     role: str  # "user" | "assistant"
     content: str
@@ -133,15 +165,16 @@ def health():
 
 
 @app.post("/api/teach")
-def teach(req: TeachRequest):
+async def teach(req: TeachRequest):
     """Generate a structured lesson for a given topic.
-    Defined as sync def so FastAPI runs it in a thread pool — prevents
-    the blocking Anthropic SDK call from stalling the event loop.
+    Awaits the agent's async path: the RAG look-ups run concurrently in
+    worker threads and the MiniMax call is awaited, so neither the event
+    loop nor a thread-pool slot is held for the length of the generation.
     """
     if teaching_agent is None:
         raise HTTPException(503, "Agents not yet initialised")
     try:
-        lesson = teaching_agent.generate_lesson(
+        lesson = await teaching_agent.generate_lesson_async(
             topic=req.topic,
             level=req.level,
             student_profile=req.student_profile,
@@ -170,38 +203,46 @@ def get_questions(
 
 
 @app.post("/api/format-questions")
-def format_questions(requests: list[FormatRequest]):
+def format_questions(items: list[FormatRequest]):
     """Batch-format raw OCR question texts into clean LaTeX markdown via MiniMax.
 
-    Questions are processed in parallel (ThreadPoolExecutor) to cut latency from
-    N × ~15s  →  ~15s total (wall-clock).
+    Questions are packed ``_FORMAT_BATCH_SIZE`` at a time into one MiniMax
+    call each (the model returns a JSON array), and the batches run in
+    parallel (ThreadPoolExecutor) — N questions cost ~N/4 round trips spread
+    over a few threads instead of N separate calls.
 
     Each result now includes ``question`` (cleaned) and ``answer`` (separated).
     """
     if teaching_agent is None:
         raise HTTPException(503, "Agents not yet initialised")
 
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    import traceback as _tb
-
-    def _fmt(r: FormatRequest) -> dict:
+    def _fmt_batch(batch: list[FormatRequest]) -> list[dict]:
         try:
-            result = teaching_agent.format_question_latex(r.raw_text, r.topic)  # type: ignore[union-attr]
-            return {
+            formatted = teaching_agent.format_question_latex_batch(  # type: ignore[union-attr]
+                [(r.raw_text, r.topic) for r in batch]
+            )
+        except Exception:
+            traceback.print_exc()
+            formatted = [{"question": r.raw_text, "answer": ""} for r in batch]
+        return [
+            {
                 "original": r.raw_text,
-                "formatted": result["question"],
-                "answer": result.get("answer", ""),
+                "formatted": f["question"],
+                "answer": f.get("answer", ""),
             }
-        except Exception:
-            _tb.print_exc()
-            return {"original": r.raw_text, "formatted": r.raw_text, "answer": ""}
+            for r, f in zip(batch, formatted)
+        ]
 
-    # Run all formatting calls concurrently (max 6 threads)
-    with ThreadPoolExecutor(max_workers=min(len(requests), 6)) as pool:
-        futures = {pool.submit(_fmt, r): i for i, r in enumerate(requests)}
-        results: list[dict | None] = [None] * len(requests)
-        for fut in as_completed(futures):
-            results[futures[fut]] = fut.result()
+    if not items:
+        return {"formatted": []}
+
+    batches = [
+        items[i : i + _FORMAT_BATCH_SIZE]
+        for i in range(0, len(items), _FORMAT_BATCH_SIZE)
+    ]
+    # Run the batched calls concurrently (max 6 threads); map keeps order
+    with ThreadPoolExecutor(max_workers=min(len(batches), 6)) as pool:
+        results = [row for rows in pool.map(_fmt_batch, batches) for row in rows]
 
     return {"formatted": results}
 
@@ -223,6 +264,33 @@ def assess(req: AssessRequest):
         raise HTTPException(500, str(e))
 
 
+@app.post("/api/assess/batch")
+def assess_batch(req: AssessBatchRequest):
+    """Evaluate several answers for one topic; grading calls run concurrently."""
+    if assessment_agent is None:
+        raise HTTPException(503, "Agents not yet initialised")
+    try:
+        results = assessment_agent.evaluate_many(
+            topic=req.topic,
+            items=[item.model_dump() for item in req.items],
+            difficulty=req.difficulty,
+        )
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(500, str(e))
+
+
+@app.get("/api/assess/{assessment_id}")
+def get_assessment(assessment_id: str):
+    """Fetch a previous assessment result by id."""
+    if assessment_agent is None:
+        raise HTTPException(503, "Agents not yet initialised")
+    result = assessment_agent.get_assessment(assessment_id)
+    if result is None:
+        raise HTTPException(404, f"Assessment {assessment_id} not found")
+    return result
+
+
 @app.post("/api/chat")
 def chat(req: ChatRequest):
     """Chat with the Orchestrator, which coordinates Teaching + Assessment agents.
@@ -250,13 +318,13 @@ def chat(req: ChatRequest):
 @app.get("/api/bedrock/status")
 def bedrock_status():
     """Check the status of the AWS Bedrock AgentCore integration."""
-    import os
     enabled = os.getenv("AWS_BEDROCK_ENABLED", "false").lower() == "true"
     return {
         "enabled": enabled,
         "available": bedrock_orchestrator is not None and bedrock_orchestrator.is_available,
         "region": AWSConfig.AWS_REGION,
         "model_id": AWSConfig.BEDROCK_MODEL_ID,
+        "classifier_model_id": AWSConfig.BEDROCK_CLASSIFIER_MODEL_ID,
         "active_sessions": len(bedrock_orchestrator.list_sessions()) if bedrock_orchestrator else 0,
     }
 
@@ -308,7 +376,7 @@ def paraphrase(req: ParaphraseRequest):
             "- Do NOT include any markdown, LaTeX, formatting, or JSON. Output ONLY the spoken text.\n"
             "- End with a brief motivational sentence."
         )
-        user_msg = f"Topic: {req.topic}\nContext: {req.context}\n\nContent to paraphrase:\n\n{req.raw_content[:4000]}"
+        user_msg = f"Topic: {req.topic}\nContext: {req.context}\n\nContent to paraphrase:\n\n{_truncate_at_sentence(req.raw_content, 4000)}"
 
         response = teaching_agent._client.messages.create(
             model=teaching_agent._model,
@@ -327,34 +395,105 @@ def paraphrase(req: ParaphraseRequest):
 
 # ── MiniMax TTS + Video endpoints ──────────────────────────────────────
 
+_MINIMAX_API = "https://api.minimax.io/v1"
+
+# One pooled keep-alive session for all MiniMax REST calls, so TTS / video
+# requests reuse TCP+TLS connections instead of handshaking every time.
+# Retry only covers idempotent methods (urllib3 default), so a POST that
+# creates a task is never silently duplicated.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504]),
+))
+_http.headers.update({"Content-Type": "application/json"})
+
+
+def _minimax_auth(api_key: str) -> dict[str, str]:
+    return {"Authorization": f"Bearer {api_key}"}
+
+
 class TTSRequest(BaseModel):
     text: str
     voice_id: str = "English_Insightful_Speaker"
     speed: float = 1.0
+    # "hex": audio inline as hex (default).  "url": MiniMax-hosted mp3 URL
+    # (valid ~24h) — the backend never holds the audio bytes at all.
+    output_format: Literal["hex", "url"] = "hex"
+
 
 class VideoRequest(BaseModel):
     prompt: str
     duration: int = 6
 
 
-@app.post("/api/tts")
-def text_to_speech(req: TTSRequest):
-    """Generate speech audio via MiniMax T2A API. Returns hex-encoded mp3."""
-    import urllib.request, json as _json
+class TTSBatchRequest(BaseModel):
+    texts: list[str]
+    voice_id: str = "English_Insightful_Speaker"
+    speed: float = 1.0
+    output_format: Literal["hex", "url"] = "hex"
+
+
+# (text-hash, voice, speed) → hex TTS result.  Regenerating narration for
+# an unchanged lesson section is served without another synthesis call.
+# URL results are not cached: MiniMax-hosted URLs expire.
+# Bounded by total hex length as well as entry count: one long narration
+# can be ~19 MB of hex, so the count cap alone would allow >1 GB.
+_TTS_CACHE_SIZE = 64
+_TTS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+_tts_cache: OrderedDict[tuple[str, str, float], dict] = OrderedDict()
+_tts_cache_bytes = 0
+_tts_cache_lock = threading.Lock()
+
+# MiniMax T2A has no bulk endpoint — bounded concurrency replaces batching
+_TTS_MAX_CONCURRENCY = 4
+
+# T2A rejects inputs of 10,000 characters or more
+_TTS_MAX_CHARS = 9_500
+# Sentence ends: CJK full-width marks, or Latin marks followed by
+# whitespace (so decimals like 3.5 are not treated as boundaries)
+_SENTENCE_END = re.compile(r"[。！？]|[.!?](?=\s)")
 
-    api_key = MiniMaxConfig.MINIMAX_API_KEY
-    if not api_key:
-        raise HTTPException(503, "MiniMax API key not configured")
+
+def _truncate_at_sentence(text: str, max_chars: int) -> str:
+    """Cut *text* to at most *max_chars*, ending on a sentence boundary.
+
+    Falls back to a hard cut only when no boundary fits in the budget.
+    """
+    if len(text) <= max_chars:
+        return text
+    head = text[:max_chars]
+    cut = 0
+    for m in _SENTENCE_END.finditer(head):
+        cut = m.end()
+    return head[:cut] if cut else head
+
+
+def _synthesize(
+    text: str, voice_id: str, speed: float, api_key: str, output_format: str = "hex",
+) -> dict:
+    """Call MiniMax T2A once (or serve from cache).  Raises HTTPException."""
+    global _tts_cache_bytes
+    text = _truncate_at_sentence(text, _TTS_MAX_CHARS)
+    as_url = output_format == "url"
+    key = (hashlib.blake2b(text.encode(), digest_size=16).hexdigest(), voice_id, speed)
+    if not as_url:
+        with _tts_cache_lock:
+            hit = _tts_cache.get(key)
+            if hit is not None:
+                _tts_cache.move_to_end(key)
+                return dict(hit)   # callers may mutate their result
 
     payload = {
         "model": "speech-2.8-hd",
-        "text": req.text,
+        "text": text,
         "stream": False,
         "language_boost": "English",
-        "output_format": "hex",
+        "output_format": output_format,
         "voice_setting": {
-            "voice_id": req.voice_id,
-            "speed": req.speed,
+            "voice_id": voice_id,
+            "speed": speed,
             "vol": 1,
             "pitch": 0,
         },
@@ -366,37 +505,80 @@ def text_to_speech(req: TTSRequest):
         },
     }
 
-    body = _json.dumps(payload).encode()
-    http_req = urllib.request.Request(
-        "https://api.minimax.io/v1/t2a_v2",
-        data=body,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
     try:
-        resp = urllib.request.urlopen(http_req, timeout=60)
-        data = _json.loads(resp.read())
-        if data.get("base_resp", {}).get("status_code", -1) != 0:
-            raise HTTPException(502, data.get("base_resp", {}).get("status_msg", "TTS failed"))
-        audio_hex = data.get("data", {}).get("audio", "")
-        extra = data.get("extra_info", {})
-        return {
-            "audio_hex": audio_hex,
-            "audio_length_ms": extra.get("audio_length", 0),
-            "format": extra.get("audio_format", "mp3"),
-        }
-    except urllib.error.URLError as e:
+        with _http.post(f"{_MINIMAX_API}/t2a_v2", json=payload,
+                        headers=_minimax_auth(api_key), timeout=60) as resp:
+            resp.raise_for_status()
+            data = resp.json()
+    except requests.RequestException as e:
         raise HTTPException(502, f"TTS request failed: {e}")
+    if data.get("base_resp", {}).get("status_code", -1) != 0:
+        raise HTTPException(502, data.get("base_resp", {}).get("status_msg", "TTS failed"))
+    audio = data.get("data", {}).get("audio", "")
+    extra = data.get("extra_info", {})
+    result = {
+        "audio_url" if as_url else "audio_hex": audio,
+        "audio_length_ms": extra.get("audio_length", 0),
+        "format": extra.get("audio_format", "mp3"),
+    }
+    if as_url:
+        return result
+
+    size = len(audio)
+    if size <= _TTS_CACHE_MAX_BYTES // 4:   # a single huge clip isn't worth evicting for
+        with _tts_cache_lock:
+            old = _tts_cache.pop(key, None)
+            if old is not None:
+                _tts_cache_bytes -= len(old["audio_hex"])
+            _tts_cache[key] = dict(result)
+            _tts_cache_bytes += size
+            while _tts_cache and (
+                len(_tts_cache) > _TTS_CACHE_SIZE or _tts_cache_bytes > _TTS_CACHE_MAX_BYTES
+            ):
+                _, evicted = _tts_cache.popitem(last=False)
+                _tts_cache_bytes -= len(evicted["audio_hex"])
+    return result
+
+
+@app.post("/api/tts")
+def text_to_speech(req: TTSRequest):
+    """Generate speech audio via MiniMax T2A API.
+
+    Returns hex-encoded mp3 (``audio_hex``), or with ``output_format="url"``
+    a MiniMax-hosted ``audio_url`` so the audio never transits the backend.
+    """
+    api_key = MiniMaxConfig.MINIMAX_API_KEY
+    if not api_key:
+        raise HTTPException(503, "MiniMax API key not configured")
+    return _synthesize(req.text, req.voice_id, req.speed, api_key, req.output_format)
+
+
+@app.post("/api/tts/batch")
+def text_to_speech_batch(req: TTSBatchRequest):
+    """Synthesize several narration snippets (e.g. one per lesson section).
+
+    Runs up to ``_TTS_MAX_CONCURRENCY`` MiniMax calls at once and returns
+    results in input order; a failed item carries ``error`` instead of audio.
+    """
+    api_key = MiniMaxConfig.MINIMAX_API_KEY
+    if not api_key:
+        raise HTTPException(503, "MiniMax API key not configured")
+    if not req.texts:
+        return {"results": []}
+
+    def _one(text: str) -> dict:
+        try:
+            return _synthesize(text, req.voice_id, req.speed, api_key, req.output_format)
+        except HTTPException as e:
+            return {"error": e.detail}
+
+    with ThreadPoolExecutor(max_workers=min(len(req.texts), _TTS_MAX_CONCURRENCY)) as pool:
+        return {"results": list(pool.map(_one, req.texts))}
 
 
 @app.post("/api/video")
 def generate_video(req: VideoRequest):
     """Create a MiniMax video generation task. Returns task_id for polling."""
-    import urllib.request, json as _json
-
     api_key = MiniMaxConfig.MINIMAX_API_KEY
     if not api_key:
         raise HTTPException(503, "MiniMax API key not configured")
@@ -409,57 +591,40 @@ def generate_video(req: VideoRequest):
         "resolution": "768P",
     }
 
-    body = _json.dumps(payload).encode()
-    http_req = urllib.request.Request(
-        "https://api.minimax.io/v1/video_generation",
-        data=body,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
     try:
-        resp = urllib.request.urlopen(http_req, timeout=30)
-        data = _json.loads(resp.read())
+        with _http.post(f"{_MINIMAX_API}/video_generation", json=payload,
+                        headers=_minimax_auth(api_key), timeout=30) as resp:
+            resp.raise_for_status()
+            data = resp.json()
         if data.get("base_resp", {}).get("status_code", -1) != 0:
             raise HTTPException(502, data.get("base_resp", {}).get("status_msg", "Video generation failed"))
         return {"task_id": data.get("task_id", "")}
-    except urllib.error.URLError as e:
+    except requests.RequestException as e:
         raise HTTPException(502, f"Video request failed: {e}")
 
 
 @app.get("/api/video/{task_id}")
 def get_video_status(task_id: str):
     """Poll the status of a MiniMax video generation task."""
-    import urllib.request, json as _json
-
     api_key = MiniMaxConfig.MINIMAX_API_KEY
     if not api_key:
         raise HTTPException(503, "MiniMax API key not configured")
 
-    url = f"https://api.minimax.io/v1/query/video_generation?task_id={task_id}"
-    http_req = urllib.request.Request(
-        url,
-        headers={"Authorization": f"Bearer {api_key}"},
-        method="GET",
-    )
+    auth = _minimax_auth(api_key)
     try:
-        resp = urllib.request.urlopen(http_req, timeout=15)
-        data = _json.loads(resp.read())
+        with _http.get(f"{_MINIMAX_API}/query/video_generation",
+                       params={"task_id": task_id}, headers=auth, timeout=15) as resp:
+            resp.raise_for_status()
+            data = resp.json()
         status = data.get("status", "unknown")
         file_id = data.get("file_id", "")
         # If done, also fetch the download URL
         download_url = ""
         if status == "Success" and file_id:
-            dl_url = f"https://api.minimax.io/v1/files/retrieve?file_id={file_id}"
-            dl_req = urllib.request.Request(
-                dl_url,
-                headers={"Authorization": f"Bearer {api_key}"},
-                method="GET",
-            )
-            dl_resp = urllib.request.urlopen(dl_req, timeout=15)
-            dl_data = _json.loads(dl_resp.read())
+            with _http.get(f"{_MINIMAX_API}/files/retrieve",
+                           params={"file_id": file_id}, headers=auth, timeout=15) as dl_resp:
+                dl_resp.raise_for_status()
+                dl_data = dl_resp.json()
             download_url = dl_data.get("file", {}).get("download_url", "")
         return {
             "task_id": task_id,
@@ -467,5 +632,5 @@ def get_video_status(task_id: str):
             "file_id": file_id,
             "download_url": download_url,
         }
-    except urllib.error.URLError as e:
+    except requests.RequestException as e:
         raise HTTPException(502, f"Video status check failed: {e}")
@@ -1,9 +1,15 @@
 """Environment configuration for EduLoop."""
 
 import os
+from functools import lru_cache
+from pathlib import Path
+
 from dotenv import load_dotenv
 
-load_dotenv()
+# The project-root .env (next to requirements.txt) — loaded by explicit
+# path so importing config doesn't walk the call stack and parent
+# directories looking for one.
+load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 
 class Config:
@@ -18,6 +24,13 @@ class AWSConfig:
     AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
     BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-5-sonnet-20241022")
+    # Intent classification is short structured output — a smaller tier suffices
+    BEDROCK_CLASSIFIER_MODEL_ID = os.getenv(
+        "BEDROCK_CLASSIFIER_MODEL_ID", "anthropic.claude-3-5-haiku-20241022-v1:0",
+    )
+    # Batch inference (offline grading): S3 prefix for job I/O + service role
+    BEDROCK_BATCH_S3_URI = os.getenv("BEDROCK_BATCH_S3_URI")      # s3://bucket/prefix/
+    BEDROCK_BATCH_ROLE_ARN = os.getenv("BEDROCK_BATCH_ROLE_ARN")
 
 
 class MiniMaxConfig:
@@ -27,6 +40,8 @@ class MiniMaxConfig:
     # Anthropic-compatible endpoint for MiniMax text models
     MINIMAX_BASE_URL = os.getenv("MINIMAX_BASE_URL", "https://api.minimax.io/anthropic")
     MINIMAX_TEXT_MODEL = os.getenv("MINIMAX_TEXT_MODEL", "MiniMax-M2.5")
+    # Grading can run on a cheaper tier; defaults to the main text model
+    MINIMAX_ASSESSMENT_MODEL = os.getenv("MINIMAX_ASSESSMENT_MODEL", MINIMAX_TEXT_MODEL)
     MINIMAX_AUDIO_VOICE = os.getenv("MINIMAX_AUDIO_VOICE", "male-cantonese")
 
 
@@ -56,11 +71,18 @@ class DSEConfig:
         "Math I": ["Calculus", "Probability", "Binomial Distribution", "Differentiation Application"],
         "Math II": ["Matrix Algebra", "Vectors", "Integration", "Mathematical Induction"]
     }
+    # Reverse index (topic → syllabus) and the flat topic set, built once
+    # so "which syllabus?" / "is this a DSE topic?" are single lookups
+    TOPIC_TO_SYLLABUS = {
+        topic: syllabus for syllabus, topics in TOPICS.items() for topic in topics
+    }
+    ALL_TOPICS = frozenset(TOPIC_TO_SYLLABUS)
     PAPER_TYPES = ["Paper 1", "Paper 2"]
     MAX_MARKS_PER_PAPER = 100
     TOTAL_EXAM_TIME_MINUTES = 150
 
 
+@lru_cache(maxsize=None)
 def get_config():
-    """Get active configuration based on environment."""
+    """Get active configuration based on environment (built once)."""
     return Config()
@@ -1,6 +1,9 @@
 """Protocol definition for Teaching-Assessment agent handshake."""
 
-AGENT_HANDSHAKE_PROTOCOL = {
+from types import MappingProxyType
+
+# Read-only view: one shared module-level dict, safe to hand out without copying
+AGENT_HANDSHAKE_PROTOCOL = MappingProxyType({
     "version": "1.0",
     "description": "JSON protocol for autonomous Teaching and Assessment agent communication",
     
@@ -138,9 +141,9 @@ AGENT_HANDSHAKE_PROTOCOL = {
             "estimated_time_to_mastery": "1 hour focused practice"
         }
     }
-}
+})
 
 # Export for use in other modules
 if __name__ == "__main__":
     import json
-    print(json.dumps(AGENT_HANDSHAKE_PROTOCOL, indent=2))
+    print(json.dumps(dict(AGENT_HANDSHAKE_PROTOCOL), indent=2))
@@ -0,0 +1,137 @@
+"""Typed models for the agent replies described by ``COMMUNICATION_PROTOCOL``.
+
+The protocol in ``config/prompts.py`` is the prompt-side contract shown to
+the LLM; these models are the code-side mirror.  They are lenient on
+purpose — every field has a default and unknown keys are kept — because
+they validate model output, which can omit fields or send the wrong
+type (off-type values are coerced to text or dropped).  Use
+``model_validate_json`` on raw reply text to parse and validate in one pass.
+The handshake payloads of ``config/protocol.py`` are mirrored at the end.
+"""
+
+from __future__ import annotations
+
+from typing import Annotated, Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict
+
+
+# ── Lenient field types for model output ─────────────────────────────
+# One off-type value (a numeric id, a null text, a number in a string
+# list) must not fail the whole reply: coerce it to text or drop it, so
+# the rest of the reply still renders.
+
+def _text(value: Any) -> Any:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def _opt_text(value: Any) -> Any:
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+def _text_list(value: Any) -> Any:
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list):
+        return []
+    return [v if isinstance(v, str) else str(v) for v in value if v is not None]
+
+
+def _dict_list(value: Any) -> Any:
+    return [v for v in value if isinstance(v, dict)] if isinstance(value, list) else []
+
+
+def _dict_or_default(value: Any) -> Any:
+    return value if isinstance(value, dict) else {}
+
+
+def _dict_or_none(value: Any) -> Any:
+    return value if isinstance(value, dict) else None
+
+
+def _score(value: Any) -> Any:
+    return value if isinstance(value, (int, float, str)) else None
+
+
+_Text = Annotated[str, BeforeValidator(_text)]
+_OptText = Annotated[Optional[str], BeforeValidator(_opt_text)]
+_TextList = Annotated[List[str], BeforeValidator(_text_list)]
+
+
+class _Reply(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class ContentBlock(_Reply):
+    type: _Text = "concept"   # introduction|concept|example|common_pitfall|summary
+    text: _Text = ""
+
+
+class TeachingReply(_Reply):
+    status: _Text = "success"
+    lesson_id: _OptText = None
+    topic: _OptText = None
+    content_blocks: Annotated[List[ContentBlock], BeforeValidator(_dict_list)] = []
+    constructive_advice: _Text = ""
+    learning_objectives: _TextList = []
+    suggested_questions_for_assessment: _TextList = []
+
+
+class DiagnosticReport(_Reply):
+    strengths: _TextList = []
+    knowledge_gaps: _TextList = []
+    constructive_feedback: _Text = ""
+    misconception_analysis: _Text = ""
+
+
+class NextStep(_Reply):
+    action: _Text = ""        # advance|review|reteach_specifics
+    focus_topics_for_teacher: _TextList = []
+
+
+class AssessmentReply(_Reply):
+    status: _Text = "success"
+    assessment_id: _OptText = None
+    # Models occasionally answer "85%" — keep ints as ints for display
+    score_percentage: Annotated[Optional[Union[int, float, str]], BeforeValidator(_score)] = None
+    diagnostic_report: Annotated[DiagnosticReport, BeforeValidator(_dict_or_default)] = DiagnosticReport()
+    next_step_recommendation: Annotated[Optional[NextStep], BeforeValidator(_dict_or_none)] = None
+
+
+# ── Handshake payloads (config/protocol.py) ───────────────────────────
+# Unlike the replies above these are produced by our own code, so ids and
+# topic are required.  Models are built once at import; validation then
+# runs in pydantic-core's compiled validator, not a per-call schema walk.
+
+class LessonContent(_Reply):
+    key_concepts: List[str] = []
+    learning_objectives: List[str] = []
+    misconceptions_addressed: List[str] = []
+    dse_coverage: str = ""
+
+
+class TeachingHandshake(_Reply):
+    lesson_id: str
+    topic: str
+    difficulty_level: str = "intermediate"   # foundational|intermediate|advanced
+    content: LessonContent = LessonContent()
+    audio_narration: Optional[dict] = None
+    student_context: dict = {}
+
+
+class KnowledgeGap(_Reply):
+    area: str
+    frequency: int = 1
+    severity: str = "medium"                 # low|medium|high
+
+
+class AssessmentHandshake(_Reply):
+    assessment_id: str
+    topic: str
+    student_performance: dict = {}
+    knowledge_gaps: List[KnowledgeGap] = []
+    error_analysis: Dict[str, int] = {}
+    misconceptions_identified: List[str] = []
+    recommendations: dict = {}
@@ -23,26 +23,50 @@ The Bedrock layer handles:
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
+import re
+import threading
 import uuid
+from collections import Counter, OrderedDict
+from contextlib import closing
 from datetime import datetime
-from enum import Enum
-from typing import Any, Dict, List, Optional
-
-import boto3
-from botocore.config import Config as BotoConfig
-from botocore.exceptions import ClientError, NoCredentialsError
+from functools import lru_cache
+from enum import StrEnum
+from heapq import nlargest
+from operator import itemgetter
+from time import time_ns
+from typing import Any, Dict, List, NamedTuple, Optional
+
+try:                                   # optional: faster JSON, bytes in and out
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps         # invoke_model takes the bytes as-is
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
 
 from config.config import AWSConfig
+from config.prompts import get_assessment_system_prompt
+from utils.llm_json import safe_json_parse
 
 logger = logging.getLogger(__name__)
 
+_UNSET = object()   # lazily-built client not created yet
+
+# Exact-match cache of Bedrock reply texts, keyed on the request body
+_RESPONSE_CACHE_SIZE = 256
+
 
 # ── Loop state machine ──────────────────────────────────────────────
 
-class LoopState(str, Enum):
-    """Learning loop states managed by the orchestrator."""
+class LoopState(StrEnum):
+    """Learning loop states managed by the orchestrator.
+
+    A ``StrEnum``, so members format and JSON-encode as their plain value.
+    """
     IDLE       = "idle"
     TEACHING   = "teaching"
     ASSESSING  = "assessing"
@@ -50,38 +74,77 @@ class LoopState(str, Enum):
     COMPLETED  = "completed"
 
 
+# Allowed next states, built once rather than on every transition
+_TRANSITIONS: Dict[LoopState, frozenset[LoopState]] = {
+    LoopState.IDLE:      frozenset({LoopState.TEACHING}),
+    LoopState.TEACHING:  frozenset({LoopState.ASSESSING, LoopState.IDLE}),
+    LoopState.ASSESSING: frozenset({LoopState.REVIEWING, LoopState.IDLE}),
+    LoopState.REVIEWING: frozenset({LoopState.TEACHING, LoopState.COMPLETED}),
+    LoopState.COMPLETED: frozenset({LoopState.IDLE, LoopState.TEACHING}),
+}
+
+
 # ── Session ─────────────────────────────────────────────────────────
 
+class SessionEvent(NamedTuple):
+    """One entry in a session's history (``as_dict()`` at the API boundary).
+
+    The time is kept as raw ``time_ns()`` and only formatted on export.
+    """
+    event: str
+    state: str
+    loop: int
+    ts_ns: int
+    data: Dict[str, Any]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "event": self.event,
+            "state": self.state,
+            "loop": self.loop,
+            "timestamp": _ns_to_iso(self.ts_ns),
+            "data": self.data,
+        }
+
+
+def _ns_to_iso(ns: int) -> str:
+    """``time_ns()`` value → local ISO-8601 string (as ``datetime.now()``)."""
+    return datetime.fromtimestamp(ns / 1e9).isoformat()
+
+
 class BedrockSession:
     """Tracks a student's learning loop session state."""
 
+    # One instance per active student session — slots keep them compact
+    # and make attribute access a fixed-offset lookup.
+    __slots__ = (
+        "session_id", "state", "current_topic", "loop_count", "history",
+        "teaching_output", "assessment_report", "knowledge_gaps",
+        "gap_counts", "mastery_scores", "created_at", "updated_at",
+    )
+
     def __init__(self, session_id: str | None = None):
         self.session_id = session_id or f"session_{uuid.uuid4().hex[:12]}"
         self.state: LoopState = LoopState.IDLE
         self.current_topic: str = ""
         self.loop_count: int = 0
-        self.history: List[Dict[str, Any]] = []
+        self.history: List[SessionEvent] = []
         self.teaching_output: Optional[Dict[str, Any]] = None
         self.assessment_report: Optional[Dict[str, Any]] = None
         self.knowledge_gaps: List[str] = []
+        # How often each gap has been reported — maintained incrementally
+        self.gap_counts: Counter[str] = Counter()
         self.mastery_scores: Dict[str, float] = {}
         self.created_at: str = datetime.now().isoformat()
         self.updated_at: str = self.created_at
 
     def transition(self, new_state: LoopState) -> None:
         """Transition to a new loop state with validation."""
-        valid_transitions = {
-            LoopState.IDLE:      [LoopState.TEACHING],
-            LoopState.TEACHING:  [LoopState.ASSESSING, LoopState.IDLE],
-            LoopState.ASSESSING: [LoopState.REVIEWING, LoopState.IDLE],
-            LoopState.REVIEWING: [LoopState.TEACHING, LoopState.COMPLETED],
-            LoopState.COMPLETED: [LoopState.IDLE, LoopState.TEACHING],
-        }
-        allowed = valid_transitions.get(self.state, [])
+        allowed = _TRANSITIONS.get(self.state, frozenset())
         if new_state not in allowed:
             logger.warning(
                 "Invalid state transition %s → %s (allowed: %s)",
-                self.state, new_state, allowed,
+                self.state, new_state, sorted(allowed),
             )
         self.state = new_state
         self.updated_at = datetime.now().isoformat()
@@ -90,19 +153,19 @@ class BedrockSession:
 
     def record_event(self, event_type: str, data: Dict[str, Any]) -> None:
         """Append an event to session history."""
-        self.history.append({
-            "event": event_type,
-            "state": self.state.value,
-            "loop": self.loop_count,
-            "timestamp": datetime.now().isoformat(),
-            "data": data,
-        })
+        self.history.append(SessionEvent(
+            event_type,
+            self.state,
+            self.loop_count,
+            time_ns(),
+            data,
+        ))
 
     def to_dict(self) -> Dict[str, Any]:
         """Serialise session for storage or API response."""
         return {
             "session_id": self.session_id,
-            "state": self.state.value,
+            "state": self.state,
             "current_topic": self.current_topic,
             "loop_count": self.loop_count,
             "knowledge_gaps": self.knowledge_gaps,
@@ -148,6 +211,73 @@ Respond with:
 }}
 """
 
+# System prompt for general conversation (``_direct_reply``)
+_DIRECT_REPLY_PROMPT = (
+    "You are EduLoop, a friendly HKDSE Mathematics study companion. "
+    "You coordinate two AI agents: a Teaching Agent and an Assessment Agent. "
+    "Keep responses concise and encouraging. Use LaTeX for math: $inline$ or $$block$$."
+)
+
+# Keyword fallback used when Bedrock is unavailable
+_TEACH_KEYWORDS = ("teach", "learn", "explain", "what is", "how to", "lesson", "show me")
+_ASSESS_KEYWORDS = ("test", "quiz", "practice", "check", "evaluate", "assess", "answer")
+# One case-insensitive alternation per intent: a single C-level scan of the
+# message instead of a Python loop of substring tests on a lowered copy
+_TEACH_RE = re.compile("|".join(map(re.escape, _TEACH_KEYWORDS)), re.IGNORECASE)
+_ASSESS_RE = re.compile("|".join(map(re.escape, _ASSESS_KEYWORDS)), re.IGNORECASE)
+
+
+# boto3 clients are thread-safe and each holds its own connection pool, so
+# one client per (service, region), from one Session, serves every
+# orchestrator in the process: no per-instance pools or TLS handshakes.
+_AWS_CLIENTS: Dict[tuple[str, str], Any] = {}
+_AWS_CLIENTS_LOCK = threading.Lock()
+
+
+def _shared_aws_client(service: str, region: str):
+    """The process-wide boto3 client for *service* in *region*."""
+    key = (service, region)
+    client = _AWS_CLIENTS.get(key)
+    if client is None:
+        with _AWS_CLIENTS_LOCK:
+            client = _AWS_CLIENTS.get(key)
+            if client is None:
+                client = _AWS_CLIENTS[key] = _aws_session().client(
+                    service,
+                    region_name=region,
+                    config=_boto_config(region),
+                )
+    return client
+
+
+@lru_cache(maxsize=1)
+def _aws_session():
+    import boto3
+    return boto3.session.Session(
+        aws_access_key_id=AWSConfig.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWSConfig.AWS_SECRET_ACCESS_KEY,
+    )
+
+
+def _boto_config(region: str):
+    from botocore.config import Config as BotoConfig
+    return BotoConfig(
+        region_name=region,
+        retries={"max_attempts": 3, "mode": "adaptive"},   # backs off on throttling
+        connect_timeout=10,
+        read_timeout=120,
+        max_pool_connections=50,
+        tcp_keepalive=True,
+    )
+
+
+def _split_s3_uri(uri: str) -> tuple[str, str]:
+    """``s3://bucket/some/prefix`` → ``("bucket", "some/prefix/")``."""
+    bucket, _, prefix = uri.removeprefix("s3://").partition("/")
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+    return bucket, prefix
+
 
 # ── Bedrock Orchestrator ────────────────────────────────────────────
 
@@ -167,43 +297,71 @@ class BedrockOrchestrator:
         model_id: str | None = None,
         teaching_agent=None,
         assessment_agent=None,
+        classifier_model_id: str | None = None,
     ):
         self.region = region or AWSConfig.AWS_REGION
         self.model_id = model_id or AWSConfig.BEDROCK_MODEL_ID
+        # Classification runs on its own (smaller) tier; chat uses model_id
+        self.classifier_model_id = classifier_model_id or AWSConfig.BEDROCK_CLASSIFIER_MODEL_ID
         self.teaching_agent = teaching_agent
         self.assessment_agent = assessment_agent
 
         # Active sessions keyed by session_id
         self._sessions: Dict[str, BedrockSession] = {}
 
-        # Initialise Bedrock runtime client
-        self._client = None
+        # Reply text per request-body digest (LRU, see _invoke_claude)
+        self._response_cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # boto3 clients are created on first use, not here: importing
+        # boto3 and building a client (credential resolution, service-model
+        # loading) costs a few hundred ms, and the backend constructs this
+        # object even when no Bedrock call is ever made.
+        self._runtime: Any = _UNSET
+        self._client_lock = threading.Lock()
+
+    @property
+    def bedrock_runtime(self):
+        """The ``bedrock-runtime`` client, built on first access.
+
+        ``None`` when boto3 is missing or the client cannot be created; the
+        failure is remembered, so it is logged once and not retried.
+        """
+        client = self._runtime
+        if client is _UNSET:
+            with self._client_lock:
+                if self._runtime is _UNSET:
+                    self._runtime = self._make_runtime_client()
+                client = self._runtime
+        return client
+
+    def _make_runtime_client(self):
+        """Build the client, or ``None`` on any failure.
+
+        Runs at first use, outside the backend's startup try/except, so
+        every error (missing credentials, NoRegionError, other
+        BotoCoreErrors) is logged here rather than raised into a handler.
+        """
         try:
-            boto_config = BotoConfig(
-                region_name=self.region,
-                retries={"max_attempts": 3, "mode": "adaptive"},
-                connect_timeout=10,
-                read_timeout=120,
-            )
-            self._client = boto3.client(
-                "bedrock-runtime",
-                config=boto_config,
-                region_name=self.region,
-                aws_access_key_id=AWSConfig.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=AWSConfig.AWS_SECRET_ACCESS_KEY,
-            )
-            logger.info(
-                "AWS Bedrock client initialised — region=%s model=%s",
-                self.region, self.model_id,
-            )
-        except (NoCredentialsError, ClientError) as e:
+            import botocore  # noqa: F401
+        except ImportError as e:
+            logger.warning("boto3 not installed — Bedrock disabled: %s", e)
+            return None
+        try:
+            client = _shared_aws_client("bedrock-runtime", self.region)
+        except Exception as e:
             logger.warning("AWS Bedrock client init failed (non-fatal): %s", e)
-            self._client = None
+            return None
+        logger.info(
+            "AWS Bedrock client initialised — region=%s model=%s classifier=%s",
+            self.region, self.model_id, self.classifier_model_id,
+        )
+        return client
 
     @property
     def is_available(self) -> bool:
         """Whether the Bedrock client is ready."""
-        return self._client is not None
+        return self.bedrock_runtime is not None
 
     # ── Session management ───────────────────────────────────────────
 
@@ -243,46 +401,94 @@ class BedrockOrchestrator:
         ``bedrock_classification``, ``extra``.
         """
         session = self.get_or_create_session(session_id)
+        classification = self._classify_intent(message, session)
+        intent, inferred_topic = self._note_intent(message, topic, session, classification)
+        result = self._dispatch(
+            intent, message, inferred_topic, session, classification, history,
+        )
+        return self._finish(result, session, classification)
+
+    async def route_async(
+        self,
+        message: str,
+        session_id: str | None = None,
+        topic: str = "",
+        history: list | None = None,
+    ) -> Dict[str, Any]:
+        """Async variant of :meth:`route` for callers on an event loop.
+
+        The blocking ``invoke_model`` calls run in a worker thread and a teach
+        intent awaits the Teaching Agent's async path, so several sessions
+        can be routed concurrently (e.g. with ``asyncio.gather``).
+        """
+        session = self.get_or_create_session(session_id)
+        classification = await asyncio.to_thread(self._classify_intent, message, session)
+        intent, inferred_topic = self._note_intent(message, topic, session, classification)
+        if intent == "teach" and hasattr(self.teaching_agent, "generate_lesson_async"):
+            session.transition(LoopState.TEACHING)
+            result = await self._invoke_teaching_async(inferred_topic, session, classification)
+        else:
+            result = await asyncio.to_thread(
+                self._dispatch,
+                intent, message, inferred_topic, session, classification, history,
+            )
+        return self._finish(result, session, classification)
+
+    def _note_intent(
+        self,
+        message: str,
+        topic: str,
+        session: BedrockSession,
+        classification: Dict[str, Any],
+    ) -> tuple[str, str]:
+        """Record the classification on *session*; return ``(intent, topic)``."""
         if topic:
             session.current_topic = topic
-
-        # ── 1. Classify intent via Bedrock ───────────────────────────
-        classification = self._classify_intent(message, session)
         intent = classification.get("intent", "direct")
-        confidence = classification.get("confidence", 0.5)
         inferred_topic = classification.get("topic") or session.current_topic or topic
 
         session.record_event("intent_classified", {
             "message": message[:200],
             "intent": intent,
-            "confidence": confidence,
+            "confidence": classification.get("confidence", 0.5),
             "topic": inferred_topic,
         })
+        return intent, inferred_topic
 
-        # ── 2. Execute based on intent ───────────────────────────────
+    def _dispatch(
+        self,
+        intent: str,
+        message: str,
+        topic: str,
+        session: BedrockSession,
+        classification: Dict[str, Any],
+        history: list | None,
+    ) -> Dict[str, Any]:
+        """Run the agent for *intent*, moving the loop state machine first."""
         if intent == "teach":
             session.transition(LoopState.TEACHING)
-            result = self._invoke_teaching(inferred_topic, session, classification)
-
-        elif intent == "assess":
+            return self._invoke_teaching(topic, session, classification)
+        if intent == "assess":
             session.transition(LoopState.ASSESSING)
-            result = self._invoke_assessment(message, inferred_topic, session, classification)
-
-        elif intent == "feedback_loop":
+            return self._invoke_assessment(message, topic, session, classification)
+        if intent == "feedback_loop":
             session.transition(LoopState.REVIEWING)
-            result = self._handle_feedback_loop(session)
+            return self._handle_feedback_loop(session)
+        # Direct response — use Bedrock Claude for conversational reply
+        return self._direct_reply(message, session, history or [])
 
-        else:
-            # Direct response — use Bedrock Claude for conversational reply
-            result = self._direct_reply(message, session, history or [])
-
-        # Attach orchestration metadata
+    def _finish(
+        self,
+        result: Dict[str, Any],
+        session: BedrockSession,
+        classification: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Attach orchestration metadata to an agent result."""
         result["session"] = session.to_dict()
-        result["loop_state"] = session.state.value
+        result["loop_state"] = session.state
         result["bedrock_classification"] = classification
         result["bedrock_model"] = self.model_id
         result["orchestrated_by"] = "aws_bedrock_agentcore"
-
         return result
 
     # ── Intent classification via Bedrock ────────────────────────────
@@ -291,57 +497,39 @@ class BedrockOrchestrator:
         self, message: str, session: BedrockSession,
     ) -> Dict[str, Any]:
         """Use Bedrock Claude to classify the student's intent."""
-        if not self._client:
+        if not self.bedrock_runtime:
             # Fallback: keyword-based classification
             return self._fallback_classify(message)
 
         system_prompt = BEDROCK_CLASSIFIER_PROMPT.format(
-            state=session.state.value,
+            state=session.state,
             topic=session.current_topic or "not set",
             loop_count=session.loop_count,
             gaps=", ".join(session.knowledge_gaps) if session.knowledge_gaps else "none identified",
         )
 
         try:
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 512,
-                "system": system_prompt,
-                "messages": [
-                    {"role": "user", "content": message},
-                ],
-            })
-
-            response = self._client.invoke_model(
-                modelId=self.model_id,
-                contentType="application/json",
-                accept="application/json",
-                body=body,
+            reply_text = self._invoke_claude(
+                system_prompt, [{"role": "user", "content": message}], max_tokens=512,
+                model_id=self.classifier_model_id,
             )
 
-            response_body = json.loads(response["body"].read())
-            reply_text = ""
-            for block in response_body.get("content", []):
-                if block.get("type") == "text":
-                    reply_text += block["text"]
-
             # Parse JSON classification
-            parsed = self._safe_json_parse(reply_text)
+            parsed = safe_json_parse(reply_text)
             if parsed and "intent" in parsed:
                 return parsed
 
             return {"intent": "direct", "confidence": 0.3, "reasoning": "parse_failure"}
 
-        except (ClientError, Exception) as e:
+        except Exception as e:
             logger.warning("Bedrock classify failed: %s — using fallback", e)
             return self._fallback_classify(message)
 
     def _fallback_classify(self, message: str) -> Dict[str, Any]:
         """Rule-based fallback when Bedrock is unavailable."""
-        msg = message.lower()
-        if any(kw in msg for kw in ["teach", "learn", "explain", "what is", "how to", "lesson", "show me"]):
+        if _TEACH_RE.search(message):
             return {"intent": "teach", "confidence": 0.7, "reasoning": "keyword_match"}
-        if any(kw in msg for kw in ["test", "quiz", "practice", "check", "evaluate", "assess", "answer"]):
+        if _ASSESS_RE.search(message):
             return {"intent": "assess", "confidence": 0.7, "reasoning": "keyword_match"}
         return {"intent": "direct", "confidence": 0.5, "reasoning": "no_keyword_match"}
 
@@ -356,46 +544,75 @@ class BedrockOrchestrator:
         """Invoke the Teaching Agent with optional gap-aware context."""
         if not self.teaching_agent:
             return {"reply": "Teaching Agent not available.", "agent_used": "error"}
-
-        # Build student profile from session data (personalisation)
-        student_profile = {
-            "knowledge_gaps": session.knowledge_gaps,
-            "mastery_scores": session.mastery_scores,
-            "loop_count": session.loop_count,
-            "difficulty_adjustment": classification.get("difficulty_adjustment"),
-        }
-
         try:
             lesson = self.teaching_agent.generate_lesson(
                 topic=topic,
                 level="intermediate",
-                student_profile=student_profile,
+                student_profile=self._student_profile(session, classification),
             )
-            session.teaching_output = lesson
-            session.record_event("teaching_completed", {
-                "topic": topic,
-                "blocks": len(lesson.get("llm_response", {}).get("content_blocks", [])),
-            })
-
-            # Format response
-            llm = lesson.get("llm_response", {})
-            parts = [f"**Lesson: {topic}**\n"]
-            for block in llm.get("content_blocks", []):
-                btype = block.get("type", "concept")
-                parts.append(f"**{btype.replace('_', ' ').title()}**\n{block.get('text', '')}")
-            advice = llm.get("constructive_advice", "")
-            if advice:
-                parts.append(f"\n**Tutor's Advice:** {advice}")
+            return self._lesson_reply(topic, session, lesson)
+        except Exception as e:
+            logger.error("Teaching Agent error: %s", e)
+            return {"reply": f"Teaching Agent error: {e}", "agent_used": "teaching"}
 
-            return {
-                "reply": "\n\n".join(parts),
-                "agent_used": "teaching",
-                "extra": lesson,
-            }
+    async def _invoke_teaching_async(
+        self,
+        topic: str,
+        session: BedrockSession,
+        classification: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """:meth:`_invoke_teaching` on the Teaching Agent's async path."""
+        try:
+            lesson = await self.teaching_agent.generate_lesson_async(
+                topic=topic,
+                level="intermediate",
+                student_profile=self._student_profile(session, classification),
+            )
+            return self._lesson_reply(topic, session, lesson)
         except Exception as e:
             logger.error("Teaching Agent error: %s", e)
             return {"reply": f"Teaching Agent error: {e}", "agent_used": "teaching"}
 
+    @staticmethod
+    def _student_profile(
+        session: BedrockSession, classification: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Build the student profile from session data (personalisation)."""
+        return {
+            "knowledge_gaps": session.knowledge_gaps,
+            "mastery_scores": session.mastery_scores,
+            "loop_count": session.loop_count,
+            "difficulty_adjustment": classification.get("difficulty_adjustment"),
+        }
+
+    @staticmethod
+    def _lesson_reply(
+        topic: str, session: BedrockSession, lesson: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Store *lesson* on the session and format it as a chat reply."""
+        session.teaching_output = lesson
+        llm = lesson.get("llm_response") or {}
+        blocks = llm.get("content_blocks") or []
+        session.record_event("teaching_completed", {
+            "topic": topic,
+            "blocks": len(blocks),
+        })
+
+        # Format response
+        parts = [f"**Lesson: {topic}**\n"]
+        for block in blocks:
+            btype = block.get("type", "concept")
+            parts.append(f"**{btype.replace('_', ' ').title()}**\n{block.get('text', '')}")
+        advice = llm.get("constructive_advice", "")
+        if advice:
+            parts.append(f"\n**Tutor's Advice:** {advice}")
+
+        return {
+            "reply": "\n\n".join(parts),
+            "agent_used": "teaching",
+            "extra": lesson,
+        }
+
     def _invoke_assessment(
         self,
         message: str,
@@ -421,7 +638,12 @@ class BedrockOrchestrator:
             diag = llm.get("diagnostic_report", {})
             gaps = diag.get("knowledge_gaps", [])
             if gaps:
-                session.knowledge_gaps = list(set(session.knowledge_gaps + gaps))
+                # gap_counts already holds every gap seen, so only genuinely
+                # new ones are appended — first-seen order, no list rebuild
+                session.knowledge_gaps.extend(
+                    g for g in dict.fromkeys(gaps) if g not in session.gap_counts
+                )
+                session.gap_counts.update(gaps)
 
             # Update mastery scores
             score = llm.get("score_percentage")
@@ -476,9 +698,15 @@ class BedrockOrchestrator:
                 "agent_used": "orchestrator",
             }
 
-        gap_topic = session.knowledge_gaps[0]  # Focus on the most recent gap
+        # Focus on the gap reported most often; only the top few are needed,
+        # so select them with a heap rather than sorting every gap.
+        top_gaps = [
+            gap for gap, _ in nlargest(3, session.gap_counts.items(), key=itemgetter(1))
+        ]
+        gap_topic = top_gaps[0] if top_gaps else session.knowledge_gaps[0]
         session.record_event("feedback_loop_triggered", {
             "gaps": session.knowledge_gaps,
+            "top_gaps": top_gaps,
             "focus": gap_topic,
             "loop": session.loop_count,
         })
@@ -498,7 +726,7 @@ class BedrockOrchestrator:
         history: List[Dict[str, str]],
     ) -> Dict[str, Any]:
         """Generate a conversational reply via Bedrock Claude."""
-        if not self._client:
+        if not self.bedrock_runtime:
             return {
                 "reply": "I'm here to help with HKDSE Mathematics! Ask me to teach a topic or assess your work.",
                 "agent_used": "orchestrator",
@@ -508,28 +736,7 @@ class BedrockOrchestrator:
             messages = [{"role": h["role"], "content": h["content"]} for h in history[-8:]]
             messages.append({"role": "user", "content": message})
 
-            body = json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": 1024,
-                "system": (
-                    "You are EduLoop, a friendly HKDSE Mathematics study companion. "
-                    "You coordinate two AI agents: a Teaching Agent and an Assessment Agent. "
-                    "Keep responses concise and encouraging. Use LaTeX for math: $inline$ or $$block$$."
-                ),
-                "messages": messages,
-            })
-
-            response = self._client.invoke_model(
-                modelId=self.model_id,
-                contentType="application/json",
-                accept="application/json",
-                body=body,
-            )
-            response_body = json.loads(response["body"].read())
-            reply = "".join(
-                b["text"] for b in response_body.get("content", [])
-                if b.get("type") == "text"
-            )
+            reply = self._invoke_claude(_DIRECT_REPLY_PROMPT, messages, max_tokens=1024)
             return {"reply": reply, "agent_used": "orchestrator"}
 
         except Exception as e:
@@ -539,29 +746,156 @@ class BedrockOrchestrator:
                 "agent_used": "orchestrator",
             }
 
-    # ── Utility ──────────────────────────────────────────────────────
+    # ── Bedrock call ─────────────────────────────────────────────────
 
-    @staticmethod
-    def _safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
-        """Extract a JSON object from LLM text."""
-        text = text.strip()
-        if text.startswith("```"):
-            first_nl = text.index("\n") if "\n" in text else 3
-            text = text[first_nl + 1:]
-        if text.endswith("```"):
-            text = text[:-3]
-        text = text.strip()
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            start = text.find("{")
-            end = text.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                try:
-                    return json.loads(text[start : end + 1])
-                except json.JSONDecodeError:
-                    return None
-        return None
+    def _invoke_claude(
+        self,
+        system: str,
+        messages: List[Dict[str, Any]],
+        max_tokens: int,
+        model_id: str | None = None,
+    ) -> str:
+        """Run one ``invoke_model`` call and return the joined reply text.
+
+        Identical requests (same model and body) are answered from an
+        in-memory LRU, so retries and repeated questions do not pay for
+        another round-trip.  *model_id* defaults to ``self.model_id``.
+        """
+        model_id = model_id or self.model_id
+        body = _json_dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": messages,
+        })
+        h = hashlib.blake2b(model_id.encode(), digest_size=16)
+        h.update(b"\0")
+        h.update(body if isinstance(body, bytes) else body.encode())
+        key = h.hexdigest()
+        with self._cache_lock:
+            hit = self._response_cache.get(key)
+            if hit is not None:
+                self._response_cache.move_to_end(key)
+                return hit
+
+        response = self.bedrock_runtime.invoke_model(
+            modelId=model_id,
+            contentType="application/json",
+            accept="application/json",
+            body=body,
+        )
+        # orjson parses the bytes directly; closing returns the connection
+        with closing(response["body"]) as stream:
+            response_body = _json_loads(stream.read())
+        reply = "".join(
+            block["text"] for block in response_body.get("content", [])
+            if block.get("type") == "text"
+        )
+        if reply:
+            with self._cache_lock:
+                self._response_cache[key] = reply
+                if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
+        return reply
+
+    # ── Batch inference (non-interactive grading) ────────────────────
+
+    def submit_assessment_batch(
+        self,
+        topic: str,
+        items: List[Dict[str, str]],
+        difficulty: str = "intermediate",
+    ) -> str:
+        """Queue ``{"question_text", "student_answer"}`` items for batch grading.
+
+        For offline runs such as re-grading a cohort: Bedrock batch inference
+        costs half the on-demand price and returns within hours.  Records
+        are written as JSONL under ``AWSConfig.BEDROCK_BATCH_S3_URI`` and the
+        job runs as ``BEDROCK_BATCH_ROLE_ARN``.  Bedrock enforces a minimum
+        job size (100 records at the time of writing).  Returns the job ARN
+        for :meth:`get_batch_results`.
+        """
+        if not (AWSConfig.BEDROCK_BATCH_S3_URI and AWSConfig.BEDROCK_BATCH_ROLE_ARN):
+            raise RuntimeError("Set BEDROCK_BATCH_S3_URI and BEDROCK_BATCH_ROLE_ARN for batch jobs")
+        if self.assessment_agent is None:
+            raise RuntimeError("Assessment Agent not available")
+
+        # Every item shares the topic, so the RAG context is fetched once
+        agent = self.assessment_agent
+        marking = agent._retrieve(topic, "marking_scheme", 5)
+        papers = agent._retrieve(topic, "paper", 3)
+        records = [
+            _json_dumps({
+                "recordId": f"{i:06d}",
+                "modelInput": {
+                    "anthropic_version": "bedrock-2023-05-31",
+                    "max_tokens": 4096,
+                    "system": get_assessment_system_prompt(
+                        topic, item.get("student_answer", ""), difficulty,
+                    ),
+                    "messages": [{"role": "user", "content": agent._build_user_message(
+                        topic, item.get("question_text", ""),
+                        item.get("student_answer", ""), marking, papers,
+                    )}],
+                },
+            })
+            for i, item in enumerate(items)
+        ]
+        body = b"\n".join(r if isinstance(r, bytes) else r.encode() for r in records)
+
+        bucket, prefix = _split_s3_uri(AWSConfig.BEDROCK_BATCH_S3_URI)
+        job_name = f"eduloop-assess-{uuid.uuid4().hex[:12]}"
+        input_key = f"{prefix}{job_name}/input.jsonl"
+        self._aws_client("s3").put_object(Bucket=bucket, Key=input_key, Body=body)
+        job = self._aws_client("bedrock").create_model_invocation_job(
+            jobName=job_name,
+            roleArn=AWSConfig.BEDROCK_BATCH_ROLE_ARN,
+            modelId=self.model_id,
+            inputDataConfig={"s3InputDataConfig": {"s3Uri": f"s3://{bucket}/{input_key}"}},
+            outputDataConfig={"s3OutputDataConfig": {
+                "s3Uri": f"s3://{bucket}/{prefix}{job_name}/output/",
+            }},
+        )
+        logger.info("Submitted Bedrock batch job %s (%d records)", job["jobArn"], len(records))
+        return job["jobArn"]
+
+    def get_batch_results(self, job_arn: str) -> Dict[str, Any]:
+        """Status of a batch job and, once completed, its parsed replies.
+
+        ``results`` maps each item's index in the submitted list to its
+        parsed reply (``None`` if the reply was not JSON); records Bedrock
+        failed to run are absent.
+        """
+        job = self._aws_client("bedrock").get_model_invocation_job(jobIdentifier=job_arn)
+        status = job["status"]
+        if status != "Completed":
+            return {"status": status, "message": job.get("message", ""), "results": {}}
+
+        bucket, prefix = _split_s3_uri(job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"])
+        input_name = job["inputDataConfig"]["s3InputDataConfig"]["s3Uri"].rsplit("/", 1)[-1]
+        key = f"{prefix}{job_arn.rsplit('/', 1)[-1]}/{input_name}.out"
+        body = self._aws_client("s3").get_object(Bucket=bucket, Key=key)["Body"]
+
+        # The output can run to many MB: parse it record by record as it
+        # streams in rather than buffering the whole object first
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+        with closing(body):
+            for line in body.iter_lines():
+                if not line.strip():
+                    continue
+                record = _json_loads(line)
+                output = record.get("modelOutput") or {}
+                text = "".join(
+                    b["text"] for b in output.get("content", []) if b.get("type") == "text"
+                )
+                results[int(record["recordId"])] = safe_json_parse(text) if text else None
+        return {"status": status, "results": results}
+
+    def _aws_client(self, service: str):
+        """A boto3 client for *service* (S3, Bedrock control plane)."""
+        return _shared_aws_client(service, self.region)
+
+    # ── Utility ──────────────────────────────────────────────────────
 
     def get_session_report(self, session_id: str) -> Dict[str, Any]:
         """Generate a comprehensive session report for the student."""
@@ -571,7 +905,7 @@ class BedrockOrchestrator:
 
         return {
             **session.to_dict(),
-            "history": session.history,
+            "history": [e.as_dict() for e in session.history],
             "teaching_output": session.teaching_output,
             "assessment_report": session.assessment_report,
             "feedback_loops_completed": session.loop_count,
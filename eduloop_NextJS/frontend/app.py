@@ -1,7 +1,11 @@
 """Streamlit frontend application for EduLoop."""
 
+from __future__ import annotations
+
 import sys
+import time
 from pathlib import Path
+from types import MappingProxyType
 
 # Ensure project root is on the path so we can import our modules
 _project_root = str(Path(__file__).resolve().parent.parent)
@@ -10,15 +14,18 @@ if _project_root not in sys.path:
 
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from datetime import datetime
-from typing import Dict, Any, Optional
+import pyarrow as pa                       # ships with streamlit
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
 from knowledge_base.rag_retriever import DSERetriever
 from agents.teaching_agent import TeachingAgent
 from agents.assessment_agent import AssessmentAgent
 from config.config import DatabaseConfig, MiniMaxConfig
 
+if TYPE_CHECKING:
+    # plotly costs a few hundred ms to import; only the chart builders need it
+    import plotly.graph_objects as go
+
 # Configure page
 st.set_page_config(
     page_title="EduLoop DSE",
@@ -27,8 +34,9 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS
-st.markdown("""
+# Custom CSS.  Emitted on every run: Streamlit drops any element a rerun
+# does not re-emit, so a once-per-session guard would lose the styles.
+_CSS = """
 <style>
     .main-title {
         color: #1f77b4;
@@ -37,25 +45,38 @@ st.markdown("""
         font-weight: bold;
         margin-bottom: 20px;
     }
-    .metric-card {
-        background-color: #f0f2f6;
-        padding: 20px;
-        border-radius: 10px;
-        margin: 10px 0;
-    }
-    .progress-section {
-        background-color: #e8f4f8;
-        padding: 15px;
-        border-radius: 8px;
-        margin: 10px 0;
-    }
     /* Ensure LaTeX blocks render with proper spacing */
     .katex-display {
         margin: 1em 0 !important;
         overflow-x: auto;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(_CSS, unsafe_allow_html=True)
+
+
+# ── Syllabus → topic options shared by the Learn and Practice pages ──
+_TOPICS_MAP = MappingProxyType({
+    "Math Foundation": ("Quadratic Equations", "Functions", "Geometry", "Trigonometry"),
+    "Math I": ("Calculus", "Probability", "Binomial Distribution"),
+    "Math II": ("Matrix Algebra", "Vectors", "System of Linear Equations"),
+})
+_SYLLABI = tuple(_TOPICS_MAP)
+
+# ── Static demo tables (built once per process, not per rerun) ────────
+# Arrow tables go straight to IPC bytes in st.dataframe, skipping the
+# pandas → Arrow conversion a DataFrame would pay on every run.
+_ACTIVITY_TABLE = pa.table({
+    "Date": ["2024-02-27", "2024-02-26", "2024-02-25"],
+    "Activity": ["Completed: Quadratic Equations", "Assessment: Polynomials", "Lesson: Functions"],
+    "Score": ["8/10", "7/10", "N/A"]
+})
+
+_GAPS_TABLE = pa.table({
+    "Area": ["Quadratic Equations", "Function Composition", "Trig Identities"],
+    "Frequency": [4, 2, 3],
+    "Priority": ["High", "Medium", "Medium"]
+})
 
 
 def initialize_session_state():
@@ -99,32 +120,45 @@ def sidebar_navigation():
     
     page = st.sidebar.radio(
         "Select Page",
-        ["Dashboard", "Learn", "Practice", "Progress", "Settings"]
+        tuple(_PAGES)
     )
     
     return page
 
 
+@st.cache_resource
+def build_radar(subjects: tuple, scores: tuple) -> go.Figure:
+    """Build the mastery radar once per (subjects, scores) pair."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(data=go.Scatterpolargl(
+        r=scores,
+        theta=subjects,
+        fill='toself',
+        name='Mastery Level'
+    ))
+    fig.update_layout(
+        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+        title="HKDSE Subject Mastery",
+        height=500
+    )
+    return fig
+
+
 def dashboard_page():
     """Display main dashboard."""
     st.markdown('<h1 class="main-title">📚 EduLoop DSE Learning Platform</h1>', unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns(3)
     
-    with col1:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+    with col1.container(border=True):
         st.metric("Lessons Completed", len(st.session_state.lesson_history), "+2 this week")
-        st.markdown('</div>', unsafe_allow_html=True)
     
-    with col2:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+    with col2.container(border=True):
         st.metric("Average Score", "75%", "+5% improvement")
-        st.markdown('</div>', unsafe_allow_html=True)
     
-    with col3:
-        st.markdown('<div class="metric-card">', unsafe_allow_html=True)
+    with col3.container(border=True):
         st.metric("Study Streak", "7 days", "Keep it up!")
-        st.markdown('</div>', unsafe_allow_html=True)
     
     # Progress radar chart
     st.subheader("📊 Mastery Progress by Math Syllabus Topic")
@@ -132,29 +166,35 @@ def dashboard_page():
     subjects = ["Algebra", "Geometry", "Trigonometry", "Calculus", "Statistics"]
     scores = [78, 82, 65, 71, 88]
     
-    fig = go.Figure(data=go.Scatterpolar(
-        r=scores,
-        theta=subjects,
-        fill='toself',
-        name='Mastery Level'
-    ))
+    fig = build_radar(tuple(subjects), tuple(scores))
     
-    fig.update_layout(
-        polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
-        title="HKDSE Subject Mastery",
-        height=500
+    st.plotly_chart(
+        fig,
+        use_container_width=True,
+        config={"staticPlot": False, "plotGlPixelRatio": 1},
     )
     
-    st.plotly_chart(fig, use_container_width=True)
-    
     # Recent activity
     st.subheader("📅 Recent Activity")
-    activity_data = {
-        "Date": ["2024-02-27", "2024-02-26", "2024-02-25"],
-        "Activity": ["Completed: Quadratic Equations", "Assessment: Polynomials", "Lesson: Functions"],
-        "Score": ["8/10", "7/10", "N/A"]
-    }
-    st.dataframe(pd.DataFrame(activity_data), use_container_width=True)
+    st.dataframe(_ACTIVITY_TABLE, use_container_width=True)
+
+
+# content_block type → (heading, renderer); unknown types fall back to a
+# title-cased heading rendered as markdown.
+_BLOCK_RENDERERS = {
+    "introduction":   ("### 📖 Introduction", st.markdown),
+    "concept":        ("### 📘 Concept", st.markdown),
+    "example":        ("### 📝 Worked Example", st.markdown),
+    "common_pitfall": ("### ⚠️ Common Pitfall", st.warning),
+    "summary":        ("### ✅ Summary", st.success),
+}
+
+
+def syllabus_topic_picker(key_prefix: str, label: str = "Syllabus") -> tuple[str, str]:
+    """Syllabus + topic selectboxes, keyed per page; returns ``(syllabus, topic)``."""
+    syllabus = st.selectbox(label, _SYLLABI, key=f"{key_prefix}_syllabus")
+    topic = st.selectbox("Topic", _TOPICS_MAP[syllabus], key=f"{key_prefix}_topic")
+    return syllabus, topic
 
 
 def learn_page():
@@ -165,35 +205,35 @@ def learn_page():
 
     with col1:
         st.subheader("Select Syllabus")
-        syllabus = st.selectbox(
-            "Syllabus",
-            ["Math Foundation", "Math I", "Math II"],
-        )
-
-        topics_map = {
-            "Math Foundation": ["Quadratic Equations", "Functions", "Geometry", "Trigonometry"],
-            "Math I": ["Calculus", "Probability", "Binomial Distribution"],
-            "Math II": ["Matrix Algebra", "Vectors", "System of Linear Equations"],
-        }
-
-        topic = st.selectbox("Topic", topics_map[syllabus])
+        syllabus, topic = syllabus_topic_picker("learn")
 
         if st.button("📝 Generate Lesson", use_container_width=True):
-            with st.spinner("Querying RAG database & calling MiniMax AI tutor…"):
+            with st.status("Querying RAG database & calling MiniMax AI tutor…") as status:
                 st.session_state.current_topic = f"{syllabus} — {topic}"
 
                 retriever: DSERetriever = st.session_state.rag_retriever
                 rag_results = retriever.retrieve(topic, k=5)
                 st.session_state.rag_context = rag_results
 
+                # Stream the tutor's draft so progress shows from the first token
+                draft, tail = st.empty(), ""
+
+                def on_text(delta: str) -> None:
+                    nonlocal tail
+                    tail = (tail + delta)[-400:]
+                    draft.caption(tail)
+
                 agent: TeachingAgent = st.session_state.teaching_agent
                 lesson = agent.generate_lesson(
                     topic=topic,
                     level=st.session_state.student_profile.get("level", "intermediate"),
                     student_profile=st.session_state.student_profile,
+                    on_text=on_text,
                 )
+                draft.empty()
                 st.session_state.current_lesson = lesson
-                st.success(f"Lesson on **{topic}** ready! ({lesson.get('rag_chunks_used', 0)} RAG chunks used)")
+                status.update(label="Lesson ready", state="complete", expanded=False)
+            st.success(f"Lesson on **{topic}** ready! ({lesson.get('rag_chunks_used', 0)} RAG chunks used)")
 
         # API key status indicator
         if MiniMaxConfig.MINIMAX_API_KEY:
@@ -225,26 +265,11 @@ def learn_page():
                 if blocks:
                     for block in blocks:
                         btype = block.get("type", "concept")
-                        text  = block.get("text", "")
-
-                        if btype == "introduction":
-                            st.markdown("### 📖 Introduction")
-                            st.markdown(text)
-                        elif btype == "concept":
-                            st.markdown("### 📘 Concept")
-                            st.markdown(text)
-                        elif btype == "example":
-                            st.markdown("### 📝 Worked Example")
-                            st.markdown(text)
-                        elif btype == "common_pitfall":
-                            st.markdown("### ⚠️ Common Pitfall")
-                            st.warning(text)
-                        elif btype == "summary":
-                            st.markdown("### ✅ Summary")
-                            st.success(text)
-                        else:
-                            st.markdown(f"### {btype.title()}")
-                            st.markdown(text)
+                        heading, render = _BLOCK_RENDERERS.get(
+                            btype, (f"### {btype.title()}", st.markdown),
+                        )
+                        st.markdown(heading)
+                        render(block.get("text", ""))
                         st.divider()
                 else:
                     st.info("Click **Generate Lesson** to begin.")
@@ -253,9 +278,9 @@ def learn_page():
             with tabs[1]:
                 objectives = llm.get("learning_objectives", [])
                 if objectives:
-                    st.markdown("### 🎯 Learning Objectives")
-                    for obj in objectives:
-                        st.markdown(f"- {obj}")
+                    st.markdown("### 🎯 Learning Objectives\n" + "".join(
+                        f"\n- {obj}" for obj in objectives
+                    ))
                 else:
                     st.info("No learning objectives returned.")
 
@@ -269,9 +294,9 @@ def learn_page():
             with tabs[2]:
                 suggestions = llm.get("suggested_questions_for_assessment", [])
                 if suggestions:
-                    st.markdown("### 📝 Suggested Practice Questions")
-                    for i, q in enumerate(suggestions, 1):
-                        st.markdown(f"{i}. {q}")
+                    st.markdown("### 📝 Suggested Practice Questions\n" + "".join(
+                        f"\n{i}. {q}" for i, q in enumerate(suggestions, 1)
+                    ))
                 else:
                     st.info("No suggested questions returned.")
 
@@ -299,18 +324,7 @@ def practice_page():
 
     with col1:
         st.subheader("Start Assessment")
-        syllabus = st.selectbox(
-            "Syllabus Context",
-            ["Math Foundation", "Math I", "Math II"],
-        )
-
-        topics_map = {
-            "Math Foundation": ["Quadratic Equations", "Functions", "Geometry", "Trigonometry"],
-            "Math I": ["Calculus", "Probability", "Binomial Distribution"],
-            "Math II": ["Matrix Algebra", "Vectors", "System of Linear Equations"],
-        }
-
-        topic = st.selectbox("Topic", topics_map[syllabus], key="practice_topic")
+        syllabus, topic = syllabus_topic_picker("practice", "Syllabus Context")
         num_questions = st.slider("Number of Questions", 1, 10, 3)
         show_marking = st.checkbox("Show marking schemes", value=False)
 
@@ -329,7 +343,8 @@ def practice_page():
                 "topic": topic,
                 "syllabus": syllabus,
                 "num_questions": num_questions,
-                "started_at": datetime.now().isoformat(),
+                # Monotonic: only ever used for elapsed time, never shown as a date
+                "started_at_ns": time.monotonic_ns(),
                 "questions": paper_results[:num_questions],
                 "marking": marking_results[:num_questions],
             }
@@ -365,91 +380,103 @@ def practice_page():
                 )
                 return
 
-            # ── Display each question with answer box + submit ───────
-            for i, q in enumerate(questions, 1):
-                year = q.get("metadata", {}).get("year", "")
-                paper = q.get("metadata", {}).get("paper", "")
-                source = q.get("source", "")
-                label = f"DSE {year} {paper}" if year else source
-
-                with st.expander(f"Question {i}  —  {label}", expanded=(i == 1)):
-                    st.markdown(q.get("text", "_No text_"))
-                    st.caption(f"Source: {source} | Relevance: {q.get('score', 'N/A')}")
-
-                    answer = st.text_area(
-                        f"Your answer for Q{i}",
-                        key=f"answer_{i}",
-                        height=120,
-                    )
-
-                    if st.button(f"Submit & Evaluate Q{i}", key=f"submit_{i}"):
-                        if not answer.strip():
-                            st.warning("Please write your answer before submitting.")
-                        else:
-                            with st.spinner("Evaluating with MiniMax AI examiner…"):
-                                agent: AssessmentAgent = st.session_state.assessment_agent
-                                result = agent.evaluate(
-                                    topic=assessment["topic"],
-                                    question_text=q.get("text", ""),
-                                    student_answer=answer,
-                                    difficulty=st.session_state.student_profile.get("level", "intermediate"),
-                                )
-                                # Store result in session
-                                if "evaluation_results" not in st.session_state:
-                                    st.session_state.evaluation_results = {}
-                                st.session_state.evaluation_results[i] = result
-
-                    # ── Show evaluation result if available ──────────
-                    eval_results = st.session_state.get("evaluation_results", {})
-                    if i in eval_results:
-                        ev = eval_results[i]
-                        llm_r = ev.get("llm_response", {})
-
-                        if llm_r.get("status") == "error":
-                            st.error(llm_r.get("error", "Evaluation failed"))
-                        else:
-                            diag = llm_r.get("diagnostic_report", {})
-                            score = llm_r.get("score_percentage")
-
+            # ── Display each question with its answer box ─────────────
+            # Answers live in one form, so typing never triggers a rerun
+            with st.form("answers_form"):
+                for i, q in enumerate(questions, 1):
+                    year = q.get("metadata", {}).get("year", "")
+                    paper = q.get("metadata", {}).get("paper", "")
+                    source = q.get("source", "")
+                    label = f"DSE {year} {paper}" if year else source
+
+                    with st.expander(f"Question {i}  —  {label}", expanded=(i == 1)):
+                        st.markdown(q.get("text", "_No text_"))
+                        st.caption(f"Source: {source} | Relevance: {q.get('score', 'N/A')}")
+
+                        st.text_area(
+                            f"Your answer for Q{i}",
+                            key=f"answer_{i}",
+                            height=120,
+                        )
+
+                        # ── Show evaluation result if available ──────
+                        eval_results = st.session_state.get("evaluation_results", {})
+                        if i in eval_results:
+                            ev = eval_results[i]
+                            llm_r = ev.get("llm_response", {})
+
+                            if llm_r.get("status") == "error":
+                                st.error(llm_r.get("error", "Evaluation failed"))
+                            else:
+                                diag = llm_r.get("diagnostic_report", {})
+                                score = llm_r.get("score_percentage")
+
+                                st.divider()
+                                st.markdown("#### 📊 AI Evaluation")
+                                if score is not None:
+                                    st.metric("Score", f"{score}%")
+
+                                strengths = diag.get("strengths", [])
+                                if strengths:
+                                    st.markdown("**Strengths:**" + "".join(
+                                        f"\n\n✅ {s}" for s in strengths
+                                    ))
+
+                                gaps = diag.get("knowledge_gaps", [])
+                                if gaps:
+                                    st.markdown("**Knowledge Gaps:**" + "".join(
+                                        f"\n\n⚠️ {g}" for g in gaps
+                                    ))
+
+                                feedback = diag.get("constructive_feedback", "")
+                                if feedback:
+                                    st.info(f"💬 **Feedback:** {feedback}")
+
+                                misconception = diag.get("misconception_analysis", "")
+                                if misconception:
+                                    st.warning(f"🔍 **Misconception:** {misconception}")
+
+                                nxt = llm_r.get("next_step_recommendation", {})
+                                if nxt:
+                                    st.caption(
+                                        f"Next step: **{nxt.get('action', '')}** — "
+                                        f"focus on: {', '.join(nxt.get('focus_topics_for_teacher', []))}"
+                                    )
+
+                        # ── Optionally show raw marking scheme ───────
+                        if show_marking and i - 1 < len(marking):
+                            mk = marking[i - 1]
                             st.divider()
-                            st.markdown("#### 📊 AI Evaluation")
-                            if score is not None:
-                                st.metric("Score", f"{score}%")
-
-                            strengths = diag.get("strengths", [])
-                            if strengths:
-                                st.markdown("**Strengths:**")
-                                for s in strengths:
-                                    st.markdown(f"✅ {s}")
-
-                            gaps = diag.get("knowledge_gaps", [])
-                            if gaps:
-                                st.markdown("**Knowledge Gaps:**")
-                                for g in gaps:
-                                    st.markdown(f"⚠️ {g}")
-
-                            feedback = diag.get("constructive_feedback", "")
-                            if feedback:
-                                st.info(f"💬 **Feedback:** {feedback}")
-
-                            misconception = diag.get("misconception_analysis", "")
-                            if misconception:
-                                st.warning(f"🔍 **Misconception:** {misconception}")
-
-                            nxt = llm_r.get("next_step_recommendation", {})
-                            if nxt:
-                                st.caption(
-                                    f"Next step: **{nxt.get('action', '')}** — "
-                                    f"focus on: {', '.join(nxt.get('focus_topics_for_teacher', []))}"
-                                )
-
-                    # ── Optionally show raw marking scheme ───────────
-                    if show_marking and i - 1 < len(marking):
-                        mk = marking[i - 1]
-                        st.divider()
-                        st.markdown("**📋 Official Marking Scheme**")
-                        st.markdown(mk.get("text", "_No marking scheme available_"))
-                        st.caption(f"Source: {mk.get('source', '')}")
+                            st.markdown("**📋 Official Marking Scheme**")
+                            st.markdown(mk.get("text", "_No marking scheme available_"))
+                            st.caption(f"Source: {mk.get('source', '')}")
+
+                submitted = st.form_submit_button("📨 Submit All Answers")
+
+            # ── Grade every answered question in one concurrent batch ─
+            if submitted:
+                answered = [
+                    (i, q, st.session_state.get(f"answer_{i}", ""))
+                    for i, q in enumerate(questions, 1)
+                ]
+                answered = [(i, q, a) for i, q, a in answered if a.strip()]
+                if not answered:
+                    st.warning("Please write at least one answer before submitting.")
+                else:
+                    with st.spinner(f"Evaluating {len(answered)} answers with MiniMax AI examiner…"):
+                        agent: AssessmentAgent = st.session_state.assessment_agent
+                        results = agent.evaluate_many(
+                            topic=assessment["topic"],
+                            items=[
+                                {"question_text": q.get("text", ""), "student_answer": a}
+                                for _, q, a in answered
+                            ],
+                            difficulty=st.session_state.student_profile.get("level", "intermediate"),
+                        )
+                    eval_results = st.session_state.setdefault("evaluation_results", {})
+                    for (i, _, _), result in zip(answered, results):
+                        eval_results[i] = result
+                    st.rerun()   # redraw the form with the new evaluations
 
             # ── Overall summary ──────────────────────────────────────
             st.divider()
@@ -462,40 +489,57 @@ def practice_page():
                 st.metric("Years Covered", ", ".join(sorted(years)))
             with c3:
                 st.metric("Topic", assessment["topic"])
+            elapsed_min = (time.monotonic_ns() - assessment["started_at_ns"]) // 60_000_000_000
+            st.caption(f"Time on this assessment: {elapsed_min} min")
+
+
+@st.cache_data
+def _performance_frame() -> pd.DataFrame:
+    performance_data = {
+        "Topic": ["Linear Equations", "Polynomials", "Functions", "Trigonometry"],
+        "Score (%)": [85, 72, 78, 65],
+        "Attempts": [3, 2, 4, 1]
+    }
+    return pd.DataFrame(performance_data).set_index("Topic")
+
+
+@st.cache_data
+def _time_frame() -> pd.DataFrame:
+    time_data = {
+        "Day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
+        "Minutes": [45, 60, 30, 75, 50, 90, 20]
+    }
+    return pd.DataFrame(time_data).set_index("Day")
+
+
+@st.cache_resource
+def build_progress_chart() -> go.Figure:
+    """Topic scores and weekly study time as two panels of one figure."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    perf, study = _performance_frame(), _time_frame()
+    fig = make_subplots(
+        rows=1, cols=2,
+        subplot_titles=("📊 Performance by Topic", "⏰ Learning Time"),
+    )
+    fig.add_trace(go.Bar(x=perf.index, y=perf["Score (%)"], name="Score (%)"), row=1, col=1)
+    fig.add_trace(
+        go.Scattergl(x=study.index, y=study["Minutes"], mode="lines+markers", name="Minutes"),
+        row=1, col=2,
+    )
+    fig.update_layout(showlegend=False)
+    return fig
 
 
 def progress_page():
     """Display progress and analytics page."""
     st.title("📈 Your Progress & Analytics")
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Performance by Topic")
-        performance_data = {
-            "Topic": ["Linear Equations", "Polynomials", "Functions", "Trigonometry"],
-            "Score (%)": [85, 72, 78, 65],
-            "Attempts": [3, 2, 4, 1]
-        }
-        df = pd.DataFrame(performance_data)
-        st.bar_chart(df.set_index("Topic")["Score (%)"])
-    
-    with col2:
-        st.subheader("⏰ Learning Time")
-        time_data = {
-            "Day": ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
-            "Minutes": [45, 60, 30, 75, 50, 90, 20]
-        }
-        df_time = pd.DataFrame(time_data)
-        st.line_chart(df_time.set_index("Day")["Minutes"])
+    st.plotly_chart(build_progress_chart(), use_container_width=True)
     
     st.subheader("🎯 Knowledge Gaps")
-    gaps_data = {
-        "Area": ["Quadratic Equations", "Function Composition", "Trig Identities"],
-        "Frequency": [4, 2, 3],
-        "Priority": ["High", "Medium", "Medium"]
-    }
-    st.dataframe(pd.DataFrame(gaps_data), use_container_width=True)
+    st.dataframe(_GAPS_TABLE, use_container_width=True)
     
     st.subheader("💡 Recommendations")
     st.info("Based on your performance, focus on:\n\n1. Quadratic Equations - Practice 5 more problems\n2. Review function properties - Complete review lesson\n3. Trigonometric identities - Work through 10 practice sets")
@@ -554,22 +598,23 @@ def settings_page():
     st.slider("Text Size", 10, 20, 14)
 
 
+# Sidebar label → page renderer; order is the sidebar order.
+_PAGES = MappingProxyType({
+    "Dashboard": dashboard_page,
+    "Learn": learn_page,
+    "Practice": practice_page,
+    "Progress": progress_page,
+    "Settings": settings_page,
+})
+
+
 def main():
     """Main application entry point."""
     initialize_session_state()
     
     page = sidebar_navigation()
     
-    if page == "Dashboard":
-        dashboard_page()
-    elif page == "Learn":
-        learn_page()
-    elif page == "Practice":
-        practice_page()
-    elif page == "Progress":
-        progress_page()
-    elif page == "Settings":
-        settings_page()
+    _PAGES[page]()
     
     # Footer
     st.divider()
@@ -25,6 +25,7 @@ Usage:
 import argparse
 import sys
 import os
+from operator import itemgetter
 from pathlib import Path
 
 # Ensure the project root is on the Python path
@@ -148,7 +149,7 @@ def main():
     print(f"  Years covered        : {stats['years']}")
     print(f"  Source files          : {stats['sources']}")
     print(f"  Topic coverage       :")
-    for topic, count in sorted(stats["topics_coverage"].items(), key=lambda x: -x[1]):
+    for topic, count in sorted(stats["topics_coverage"].items(), key=itemgetter(1), reverse=True):
         print(f"    • {topic}: {count} chunks")
 
     # --- Step 5: Quick sanity test ---
@@ -161,6 +161,20 @@ class DSEPDFParser:
     ]
 }
 
+    # One case-insensitive alternation per topic, compiled once: each chunk
+    # is scanned once per topic instead of once per keyword, and keywords
+    # are no longer re-lowercased for every chunk.
+    _TOPIC_PATTERNS = {
+        topic: re.compile("|".join(re.escape(kw) for kw in keywords), re.IGNORECASE)
+        for topic, keywords in TOPIC_KEYWORDS.items()
+    }
+
+    # Chunk delimiters, compiled once rather than on every document.
+    # Common DSE question numbering: 'Q1.', 'Question 1', '1.', '(1)', etc.
+    _QUESTION_SPLIT = re.compile(r"(?=(?:^|\n)\s*(?:Q(?:uestion)?\s*\.?\s*)?\d{1,2}\s*[\.\)]\s)")
+    # Markdown-style (#, ##) or all-caps section titles
+    _SECTION_SPLIT = re.compile(r"(?=(?:^|\n)(?:#{1,3}\s|[A-Z][A-Z ]{4,}\n))")
+
     def __init__(self):
         """Initialize the PDF parser."""
         self._pymupdf_available = False
@@ -262,6 +276,12 @@ class DSEPDFParser:
         # Chunk the text
         chunks = self._chunk_text(raw_text, doc_type)
 
+        # Per-file values, computed once rather than per chunk
+        stem = path.stem
+        source_file = path.name
+        source_path = str(path)
+        total_chunks = len(chunks)
+
         # Build final chunk objects with metadata
         result = []
         for i, chunk_text in enumerate(chunks):
@@ -269,14 +289,14 @@ class DSEPDFParser:
             detected_topics = self._detect_topics(chunk_text)
 
             chunk_doc = {
-                "id": f"{path.stem}_chunk_{i:04d}",
+                "id": f"{stem}_chunk_{i:04d}",
                 "text": chunk_text,
                 "metadata": {
-                    "source_file": path.name,
-                    "source_path": str(path),
+                    "source_file": source_file,
+                    "source_path": source_path,
                     "document_type": doc_type,
                     "chunk_index": i,
-                    "total_chunks": len(chunks),  # will be updated after loop
+                    "total_chunks": total_chunks,
                     "year": year,
                     "paper": paper_number,
                     "detected_topics": detected_topics,
@@ -285,10 +305,6 @@ class DSEPDFParser:
             }
             result.append(chunk_doc)
 
-        # Update total_chunks now that we know the final count
-        for chunk_doc in result:
-            chunk_doc["metadata"]["total_chunks"] = len(result)
-
         return result
 
     # ------------------------------------------------------------------
@@ -401,10 +417,8 @@ class DSEPDFParser:
         Split exam papers / marking schemes by question numbers.
         Matches patterns like 'Q1.', 'Question 1', '1.', '(1)', etc.
         """
-        # Common DSE question delimiters
-        pattern = r"(?=(?:^|\n)\s*(?:Q(?:uestion)?\s*\.?\s*)?\d{1,2}\s*[\.\)]\s)"
-        parts = re.split(pattern, text)
-        parts = [p.strip() for p in parts if p.strip() and len(p.strip()) > 30]
+        parts = self._QUESTION_SPLIT.split(text)
+        parts = [p for p in map(str.strip, parts) if len(p) > 30]
         return parts if len(parts) >= 2 else []
 
     def _chunk_by_sections(self, text: str) -> List[str]:
@@ -412,9 +426,8 @@ class DSEPDFParser:
         Split curriculum / syllabus documents by headings.
         Matches markdown-style (#, ##) or all-caps section titles.
         """
-        pattern = r"(?=(?:^|\n)(?:#{1,3}\s|[A-Z][A-Z ]{4,}\n))"
-        parts = re.split(pattern, text)
-        parts = [p.strip() for p in parts if p.strip() and len(p.strip()) > 30]
+        parts = self._SECTION_SPLIT.split(text)
+        parts = [p for p in map(str.strip, parts) if len(p) > 30]
         return parts if len(parts) >= 2 else []
 
     def _chunk_sliding_window(
@@ -427,24 +440,27 @@ class DSEPDFParser:
         chunks: List[str] = []
         start = 0
         text_len = len(text)
+        half = max_size // 2          # a break must land past mid-window
 
         while start < text_len:
             end = min(start + max_size, text_len)
 
-            # Try to break at paragraph boundary
             if end < text_len:
+                min_break = start + half
+
+                # Try to break at paragraph boundary
                 para_break = text.rfind("\n\n", start, end)
-                if para_break > start + max_size // 2:
+                if para_break > min_break:
                     end = para_break
 
                 # Try sentence boundary if no paragraph break found
-                elif end < text_len:
+                else:
                     sent_break = max(
                         text.rfind(". ", start, end),
                         text.rfind("。", start, end),
                         text.rfind("? ", start, end),
                     )
-                    if sent_break > start + max_size // 2:
+                    if sent_break > min_break:
                         end = sent_break + 1
 
             chunk = text[start:end].strip()
@@ -479,9 +495,7 @@ class DSEPDFParser:
 
     def _detect_topics(self, text: str) -> List[str]:
         """Auto-detect DSE Math topics mentioned in a text chunk."""
-        text_lower = text.lower()
-        found = []
-        for topic, keywords in self.TOPIC_KEYWORDS.items():
-            if any(kw.lower() in text_lower for kw in keywords):
-                found.append(topic)
-        return found
+        return [
+            topic for topic, pattern in self._TOPIC_PATTERNS.items()
+            if pattern.search(text)
+        ]
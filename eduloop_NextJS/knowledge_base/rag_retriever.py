@@ -6,10 +6,48 @@ and retrieving the most relevant ones for a given query.  This is the
 object the Teaching Agent and Assessment Agent call at runtime.
 """
 
+import inspect
+import json
 import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+# Metadata fields drawn from a small, repeated vocabulary (a handful of
+# source files, document types, years and papers).  Interned so the
+# cached results and agent histories share one object per value.
+_INTERNED_META_KEYS = ("source_file", "document_type", "year", "paper")
+
+# Cached top-k results expire after this many seconds, so a re-ingest run
+# from another process (knowledge_base/ingest.py) that keeps the document
+# count unchanged is still picked up without restarting the server.
+_QUERY_CACHE_TTL_S = 300
+
+
+@lru_cache(maxsize=None)
+def _retrieve_accepts_where(retriever_type: type) -> bool:
+    try:
+        params = inspect.signature(retriever_type.retrieve).parameters.values()
+    except (AttributeError, TypeError, ValueError):
+        return True  # can't tell — let the call itself decide
+    return any(
+        p.name == "where" or p.kind is inspect.Parameter.VAR_KEYWORD
+        for p in params
+    )
+
+
+def accepts_where(retriever: Any) -> bool:
+    """Whether ``retriever.retrieve`` takes a ``where`` metadata filter.
+
+    Checked once per retriever class, so agents can call legacy retrievers
+    without the filter directly instead of failing and retrying each time.
+    """
+    return _retrieve_accepts_where(type(retriever))
+
 
 class DSERetriever:
     """
@@ -45,6 +83,16 @@ class DSERetriever:
         self._chroma_client = None
         self._collection = None
         self._embedding_fn = None
+        # Agents retrieve from worker threads; without this the first
+        # concurrent look-ups would each load the embedding model
+        self._init_lock = threading.Lock()
+
+        # Top-k results are deterministic until the index changes, so repeat
+        # queries (same topic/filters across lessons and assessments) skip
+        # the embedding + vector search.  Keyed on the collection size and a
+        # TTL window (ingestion usually runs in another process); also
+        # cleared on ingest / reset.
+        self._query_cached = lru_cache(maxsize=256)(self._query)
 
     # ------------------------------------------------------------------
     # Lazy initialisation
@@ -54,7 +102,11 @@ class DSERetriever:
         """Create ChromaDB client and collection on first use."""
         if self._collection is not None:
             return
+        with self._init_lock:
+            if self._collection is None:
+                self._initialise()
 
+    def _initialise(self):
         import chromadb
         from chromadb.utils import embedding_functions
 
@@ -124,6 +176,7 @@ class DSERetriever:
             ingested += len(batch)
             print(f"   📥 Ingested {ingested}/{total} chunks …")
 
+        self._query_cached.cache_clear()
         print(f"✅ Ingestion complete — {ingested} chunks in collection.")
         return ingested
 
@@ -160,20 +213,50 @@ class DSERetriever:
         """
         self._ensure_initialised()
 
+        # Guard against empty collection (count() is one query; ask once).
+        # Not cached, so chunks ingested later are found straight away.
+        total = self._collection.count()
+        if total == 0:
+            print("⚠️  Collection is empty — run ingestion first.")
+            return []
+
+        results = self._query_cached(
+            query,
+            k,
+            json.dumps(where, sort_keys=True) if where else None,
+            json.dumps(where_document, sort_keys=True) if where_document else None,
+            total,
+            int(time.monotonic() // _QUERY_CACHE_TTL_S),
+        )
+        # Copies, so a caller mutating its results can't corrupt the cache
+        return [{**r, "metadata": dict(r["metadata"])} for r in results]
+
+    def _query(
+        self,
+        query: str,
+        k: int,
+        where_json: Optional[str],
+        where_document_json: Optional[str],
+        total: int,
+        ttl_window: int,
+    ) -> tuple:
+        """Uncached ChromaDB query behind ``retrieve`` (filters as JSON keys).
+
+        ``total`` is the current collection size; it and ``ttl_window`` are
+        part of the cache key so results go stale with the index.
+        """
+        where = json.loads(where_json) if where_json else None
+        where_document = json.loads(where_document_json) if where_document_json else None
+
         query_params: Dict[str, Any] = {
             "query_texts": [query],
-            "n_results": min(k, self._collection.count() or k),
+            "n_results": min(k, total),
         }
         if where:
             query_params["where"] = where
         if where_document:
             query_params["where_document"] = where_document
 
-        # Guard against empty collection
-        if self._collection.count() == 0:
-            print("⚠️  Collection is empty — run ingestion first.")
-            return []
-
         results = self._collection.query(**query_params)
 
         # Unpack ChromaDB's nested list format
@@ -184,6 +267,10 @@ class DSERetriever:
 
         output: List[Dict[str, Any]] = []
         for doc, meta, dist, doc_id in zip(documents, metadatas, distances, ids):
+            for key in _INTERNED_META_KEYS:
+                value = meta.get(key)
+                if isinstance(value, str):
+                    meta[key] = sys.intern(value)
             output.append(
                 {
                     "id": doc_id,
@@ -194,7 +281,7 @@ class DSERetriever:
                 }
             )
 
-        return output
+        return tuple(output)
 
     # ------------------------------------------------------------------
     # Filtered convenience methods
@@ -243,6 +330,7 @@ class DSERetriever:
         self._ensure_initialised()
         self._chroma_client.delete_collection(self.collection_name)
         self._collection = None
+        self._query_cached.cache_clear()
         print(f"🗑️  Collection '{self.collection_name}' deleted.")
         # Recreate empty collection
         self._ensure_initialised()
@@ -250,31 +338,29 @@ class DSERetriever:
     def get_stats(self) -> Dict[str, Any]:
         """Return summary statistics about the current collection."""
         self._ensure_initialised()
-        all_data = self._collection.get(include=["metadatas"])
-        metas = all_data["metadatas"]
-
-        doc_types: Dict[str, int] = {}
-        years: Dict[str, int] = {}
-        topics_seen: Dict[str, int] = {}
-
+        # One fetch and one pass over the metadata for every statistic
+        # (sources used to be a second full-collection get via list_sources)
+        metas = self._collection.get(include=["metadatas"])["metadatas"]
+
+        doc_types: Counter = Counter()
+        years: Counter = Counter()
+        topics_seen: Counter = Counter()
+        sources = set()
         for m in metas:
-            dt = m.get("document_type", "unknown")
-            doc_types[dt] = doc_types.get(dt, 0) + 1
-
-            yr = m.get("year")
-            if yr:
-                years[yr] = years.get(yr, 0) + 1
-
-            for t in (m.get("detected_topics") or "").split(", "):
-                if t:
-                    topics_seen[t] = topics_seen.get(t, 0) + 1
+            doc_types[m.get("document_type", "unknown")] += 1
+            if m.get("year"):
+                years[m["year"]] += 1
+            topics = m.get("detected_topics")
+            if topics:
+                topics_seen.update(t for t in topics.split(", ") if t)
+            sources.add(m.get("source_file", "unknown"))
 
         return {
             "total_chunks": len(metas),
-            "document_types": doc_types,
-            "years": years,
-            "topics_coverage": topics_seen,
-            "sources": self.list_sources(),
+            "document_types": dict(doc_types),
+            "years": dict(years),
+            "topics_coverage": dict(topics_seen),
+            "sources": sorted(sources),
         }
 
     # ------------------------------------------------------------------
@@ -292,7 +378,7 @@ class DSERetriever:
             if value is None:
                 continue
             if isinstance(value, list):
-                clean[key] = ", ".join(str(v) for v in value)
+                clean[key] = ", ".join(map(str, value))
             elif isinstance(value, (str, int, float, bool)):
                 clean[key] = value
             else:
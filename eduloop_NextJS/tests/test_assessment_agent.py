@@ -77,4 +77,112 @@ def test_evaluate_and_history(assessment_agent):
     assert "assessment_id" in res
     hist = assessment_agent.get_history()
     assert hist and hist[0]["assessment_id"] == res["assessment_id"]
+    assert assessment_agent.get_assessment(res["assessment_id"]) is res
+    assert assessment_agent.get_assessment("nonexistent") is None
+    assert json.loads(assessment_agent.export_assessment(res["assessment_id"]))["topic"] == res["topic"]
+    assert assessment_agent.export_assessment("nonexistent") is None
+
+
+def test_evaluate_many_concurrent(assessment_agent):
+    async def fake_call(client, s, u):
+        if "boom" in u:
+            raise RuntimeError("boom")
+        return {"status": "success", "score_percentage": 50}
+
+    assessment_agent._call_llm_async = fake_call
+    items = [
+        {"question_text": "Q1", "student_answer": "A1"},
+        {"question_text": "Q2", "student_answer": "boom"},
+        {"question_text": "Q3", "student_answer": "  "},
+    ]
+    res = assessment_agent.evaluate_many("Area", items)
+    assert [r["student_answer"] for r in res] == ["A1", "boom", "  "]
+    assert res[0]["llm_response"]["status"] == "success"
+    assert res[1]["llm_response"]["status"] == "error"
+    # blank answers are scored locally, without RAG or LLM
+    assert res[2]["llm_response"]["score_percentage"] == 0
+    assert res[2]["rag_chunks_used"] == 0
+    assert len(assessment_agent.get_history()) == 3
+    assert assessment_agent.evaluate_many("Area", []) == []
+
+
+def test_evaluate_many_single_batched_call(monkeypatch, assessment_agent):
+    calls = []
+
+    class FakeStream:
+        def __init__(self, **kw):
+            calls.append(kw)
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        @property
+        async def text_stream(self):
+            for piece in ('[{"score_percentage": 80}, ', '{"score_percentage": 40}]'):
+                yield piece
+
+    class FakeAsyncClient:
+        messages = type("M", (), {"stream": staticmethod(FakeStream)})()
+
+    assessment_agent._client = object()
+    monkeypatch.setattr("agents.assessment_agent.get_async_client", lambda key: FakeAsyncClient())
+    res = assessment_agent.evaluate_many("Area", [
+        {"question_text": "Q1", "student_answer": "A1"},
+        {"question_text": "Q2", "student_answer": "A2"},
+    ])
+    assert len(calls) == 1
+    assert [r["llm_response"]["score_percentage"] for r in res] == [80, 40]
+
+
+def test_evaluate_many_failed_group_gets_separate_errors(assessment_agent):
+    """Each item of a failed group owns its error dict."""
+    async def failing_group(*args, **kw):
+        raise RuntimeError("down")
+
+    assessment_agent._grade_group_async = failing_group
+    res = assessment_agent.evaluate_many("Area", [
+        {"question_text": "Q1", "student_answer": "A1"},
+        {"question_text": "Q2", "student_answer": "A2"},
+    ])
+    first, second = (r["llm_response"] for r in res)
+    assert first["status"] == second["status"] == "error"
+    first["error"] = "changed"
+    assert second["error"] == "LLM call failed: down"
+
+
+def test_call_llm_caches_identical_prompts(assessment_agent):
+    class DummyBlock:
+        type = "text"
+        def __init__(self, t):
+            self.text = t
 
+    calls = []
+
+    def create(self, **kw):
+        calls.append(kw)
+        return type("R", (), {"content": [DummyBlock('{"score_percentage": 70}')]})()
+
+    assessment_agent._client = type("C", (), {"messages": type("M", (), {"create": create})()})()
+    first = assessment_agent._call_llm("s", "u")
+    second = assessment_agent._call_llm("s", "u")
+    assert first == second == {"score_percentage": 70}
+    assert first is not second
+    assert len(calls) == 1
+    assessment_agent._call_llm("s", "other")
+    assert len(calls) == 2
+
+
+def test_handshake_examples_validate():
+    """The protocol's example payloads match the handshake models."""
+    from pydantic import ValidationError
+    from config.protocol import AGENT_HANDSHAKE_PROTOCOL as P
+    from config.schemas import AssessmentHandshake, TeachingHandshake
+
+    assert TeachingHandshake.model_validate(P["example_teaching_payload"]).lesson_id
+    report = AssessmentHandshake.model_validate(P["example_assessment_payload"])
+    assert report.knowledge_gaps[0].area == "Quadratic Formula Application"
+    with pytest.raises(ValidationError):
+        AssessmentHandshake.model_validate({"topic": "x"})
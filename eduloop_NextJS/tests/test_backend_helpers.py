@@ -0,0 +1,68 @@
+"""Unit tests for helpers in the FastAPI backend."""
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from backend.main import _truncate_at_sentence
+
+
+def test_truncate_at_sentence_short_text_unchanged():
+    """Text within budget is returned as-is."""
+    assert _truncate_at_sentence("One. Two.", 100) == "One. Two."
+
+
+def test_truncate_at_sentence_cjk_full_stop():
+    """CJK full-width marks count as sentence ends (no trailing space needed)."""
+    text = "第一句。第二句！第三句還沒有完結"
+    assert _truncate_at_sentence(text, 12) == "第一句。第二句！"
+
+
+def test_truncate_at_sentence_ignores_decimals():
+    """A '.' inside a number like 3.14 is not a sentence boundary."""
+    text = "Pi is about 3.14 here. The rest keeps going"
+    assert _truncate_at_sentence(text, 30) == "Pi is about 3.14 here."
+    assert _truncate_at_sentence("Pi is 3.14159265", 9) == "Pi is 3.1"
+
+
+def test_truncate_at_sentence_without_break_hard_cuts():
+    """With no boundary inside the budget, fall back to a hard cut."""
+    assert _truncate_at_sentence("a" * 50, 10) == "a" * 10
+
+
+def test_tts_cache_bounded_by_bytes(monkeypatch):
+    """The TTS cache evicts by total audio size and hands out copies."""
+    import backend.main as m
+
+    class FakeResp:
+        def __init__(self, audio):
+            self.audio = audio
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def raise_for_status(self):
+            pass
+        def json(self):
+            return {"base_resp": {"status_code": 0}, "data": {"audio": self.audio}}
+
+    calls = []
+
+    def post(url, json, **kw):
+        calls.append(json["text"])
+        return FakeResp("ab" * 100)          # 200 hex chars per clip
+
+    monkeypatch.setattr(m._http, "post", post)
+    monkeypatch.setattr(m, "_tts_cache", m.OrderedDict())
+    monkeypatch.setattr(m, "_tts_cache_bytes", 0)
+    monkeypatch.setattr(m, "_TTS_CACHE_MAX_BYTES", 1000)
+
+    for i in range(10):
+        m._synthesize(f"clip {i}", "voice", 1.0, "key")
+    assert m._tts_cache_bytes <= 1000
+    assert len(m._tts_cache) == 5
+
+    first = m._synthesize("clip 9", "voice", 1.0, "key")
+    first["audio_hex"] = "changed"
+    assert m._synthesize("clip 9", "voice", 1.0, "key")["audio_hex"] == "ab" * 100
+    assert len(calls) == 10
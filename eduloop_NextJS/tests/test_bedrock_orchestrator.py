@@ -0,0 +1,23 @@
+"""Unit tests for the Bedrock orchestrator's lazy client."""
+
+import pytest
+
+botocore_exceptions = pytest.importorskip("botocore.exceptions")
+
+import core.bedrock_orchestrator as bo
+
+
+def test_client_init_failure_is_cached_as_unavailable(monkeypatch):
+    """Any boto error at first use disables Bedrock once, without raising."""
+    calls = []
+
+    def failing(service, region):
+        calls.append(service)
+        raise botocore_exceptions.NoRegionError()
+
+    monkeypatch.setattr(bo, "_shared_aws_client", failing)
+    orch = bo.BedrockOrchestrator(region="us-east-1")
+
+    assert orch.is_available is False
+    assert orch.bedrock_runtime is None
+    assert calls == ["bedrock-runtime"]
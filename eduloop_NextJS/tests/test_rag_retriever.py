@@ -0,0 +1,64 @@
+"""Unit tests for the DSERetriever query cache."""
+
+from knowledge_base.rag_retriever import DSERetriever
+
+
+class FakeCollection:
+    """Minimal stand-in for a ChromaDB collection."""
+    def __init__(self, docs=()):
+        self.docs = list(docs)
+        self.queries = 0
+
+    def count(self):
+        return len(self.docs)
+
+    def query(self, query_texts, n_results, **kw):
+        self.queries += 1
+        docs = self.docs[:n_results]
+        return {
+            "documents": [docs],
+            "metadatas": [[{"source_file": "src.pdf"} for _ in docs]],
+            "distances": [[0.25 for _ in docs]],
+            "ids": [[f"id{i}" for i in range(len(docs))]],
+        }
+
+
+def _retriever(collection):
+    r = DSERetriever()
+    r._collection = collection
+    return r
+
+
+def test_empty_results_are_not_cached():
+    """A query before ingestion must not pin the empty result."""
+    coll = FakeCollection()
+    r = _retriever(coll)
+    assert r.retrieve("algebra") == []
+
+    coll.docs.append("chunk")       # ingested by another process
+    assert [x["text"] for x in r.retrieve("algebra")] == ["chunk"]
+
+
+def test_cache_keyed_on_collection_size():
+    """Repeat queries hit the cache until the collection changes size."""
+    coll = FakeCollection(["a"])
+    r = _retriever(coll)
+    r.retrieve("q")
+    r.retrieve("q")
+    assert coll.queries == 1
+
+    coll.docs.append("b")
+    assert len(r.retrieve("q", k=5)) == 2
+    assert coll.queries == 2
+
+
+def test_results_are_copies():
+    """Mutating a returned result does not leak into later calls."""
+    r = _retriever(FakeCollection(["a"]))
+    first = r.retrieve("q")
+    first[0]["text"] = "changed"
+    first[0]["metadata"]["source_file"] = "changed"
+
+    again = r.retrieve("q")
+    assert again[0]["text"] == "a"
+    assert again[0]["metadata"]["source_file"] == "src.pdf"
@@ -0,0 +1,43 @@
+"""Unit tests for the lenient agent-reply models."""
+
+from agents.orchestrator_agent import _as_reply
+from config.schemas import AssessmentReply, TeachingReply
+
+
+def test_off_type_ids_are_coerced():
+    """A numeric lesson id is kept as text instead of failing the reply."""
+    reply = _as_reply(TeachingReply, {"lesson_id": 123, "constructive_advice": "Keep going"})
+    assert reply.lesson_id == "123"
+    assert reply.constructive_advice == "Keep going"
+
+
+def test_null_block_text_keeps_other_blocks():
+    """A block with null text renders empty; its neighbours survive."""
+    reply = _as_reply(TeachingReply, {"content_blocks": [
+        {"type": "concept", "text": None},
+        "not a block",
+        {"type": "example", "text": "x = 2"},
+    ]})
+    assert [(b.type, b.text) for b in reply.content_blocks] == [
+        ("concept", ""), ("example", "x = 2"),
+    ]
+
+
+def test_string_lists_coerce_or_drop_items():
+    """Numbers in string lists become text; nulls are dropped."""
+    reply = _as_reply(TeachingReply, {"learning_objectives": [1, None, "Factorise"]})
+    assert reply.learning_objectives == ["1", "Factorise"]
+
+
+def test_malformed_assessment_fields_fall_back_per_field():
+    """Bad nested values reset only their own field."""
+    reply = _as_reply(AssessmentReply, {
+        "score_percentage": [80],
+        "diagnostic_report": "n/a",
+        "next_step_recommendation": "review",
+        "assessment_id": 7,
+    })
+    assert reply.score_percentage is None
+    assert reply.diagnostic_report.strengths == []
+    assert reply.next_step_recommendation is None
+    assert reply.assessment_id == "7"
@@ -2,6 +2,7 @@
 
 import pytest
 import json
+import os
 from agents.teaching_agent import TeachingAgent, _safe_json_parse
 
 
@@ -29,6 +30,8 @@ def test_safe_json_parse():
     assert _safe_json_parse('{"foo":1}') == {"foo": 1}
     assert _safe_json_parse("```json\n{\"bar\":2}\n```") == {"bar": 2}
     assert _safe_json_parse("no json here") is None
+    assert _safe_json_parse('\ufeff{"bom": 3}') == {"bom": 3}
+    assert _safe_json_parse('Here you go: {"a": 1} Hope that helps {x}') == {"a": 1}
 
 
 def test_build_user_message():
@@ -58,6 +61,17 @@ def test_retrieve_methods(teaching_agent, dummy_rag):
     teaching_agent.rag = Broken()
     assert teaching_agent._retrieve("t") == []
 
+    # Retriever without a ``where`` filter -> called once, unfiltered
+    class Legacy:
+        def __init__(self):
+            self.calls = 0
+        def retrieve(self, topic, k=5):
+            self.calls += 1
+            return [{"source": "legacy", "text": "x"}]
+    teaching_agent.rag = Legacy()
+    assert teaching_agent._retrieve("t", doc_type="paper") == [{"source": "legacy", "text": "x"}]
+    assert teaching_agent.rag.calls == 1
+
     # RAG is None -> empty list
     teaching_agent.rag = None
     assert teaching_agent._retrieve("anything") == []
@@ -92,9 +106,35 @@ def test_call_llm_success(monkeypatch, teaching_agent):
     assert out == {"hello": "world"}
 
 
+def test_call_llm_streams_text(teaching_agent):
+    """With on_text, deltas are forwarded and the final message is parsed."""
+    class DummyBlock:
+        type = "text"
+        def __init__(self, text):
+            self.text = text
+
+    class DummyStream:
+        text_stream = ['{"hello": ', '"world"}']
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def get_final_message(self):
+            return type("R", (), {"content": [DummyBlock('{"hello": "world"}')]})()
+
+    teaching_agent._client = type(
+        "C", (), {"messages": type("M", (), {"stream": lambda self, **kw: DummyStream()})()},
+    )()
+    teaching_agent._model = "dummy"
+    seen = []
+    out = teaching_agent._call_llm("sys", "usr", on_text=seen.append)
+    assert out == {"hello": "world"}
+    assert seen == DummyStream.text_stream
+
+
 def test_generate_lesson_and_history(teaching_agent):
     """End-to-end lesson generation utilising stubbed llm and rag."""
-    teaching_agent._call_llm = lambda s, u: {"status": "success", "content_blocks": []}
+    teaching_agent._call_llm = lambda s, u, **kw: {"status": "success", "content_blocks": []}
     teaching_agent.rag = type("R", (), {"retrieve": lambda self, *args, **kw: [{"source": "A", "text": "T"}]})()
     lesson = teaching_agent.generate_lesson(
         topic="T", level="L", student_profile={"learning_style": "visual"}
@@ -111,3 +151,97 @@ def test_generate_lesson_and_history(teaching_agent):
     assert json.loads(exported)["topic"] == "T"
     assert teaching_agent.export_lesson("nonexistent") is None
 
+
+def test_format_question_latex_batch(teaching_agent):
+    """One call formats the whole batch; bad slots fall back per item."""
+    class DummyBlock:
+        type = "text"
+        def __init__(self, text):
+            self.text = text
+
+    calls = []
+
+    def create(self, **kw):
+        calls.append(kw)
+        if "JSON array" in kw["system"]:
+            reply = '[{"question": "$x=1$", "answer": "1"}, {"question": ""}]'
+        else:
+            reply = '{"question": "$y=2$", "answer": ""}'
+        return type("R", (), {"content": [DummyBlock(reply)]})()
+
+    teaching_agent._client = type("C", (), {"messages": type("M", (), {"create": create})()})()
+    teaching_agent._model = "dummy"
+    out = teaching_agent.format_question_latex_batch(
+        [("x=1", "Algebra"), ("   ", "Algebra"), ("y=2", "Algebra")]
+    )
+    assert out == [
+        {"question": "$x=1$", "answer": "1"},
+        {"question": "   ", "answer": ""},
+        {"question": "$y=2$", "answer": ""},
+    ]
+    assert len(calls) == 2
+
+
+def test_generate_lesson_async(teaching_agent):
+    """The async path gathers retrievals and awaits the async LLM call."""
+    import asyncio
+
+    async def fake_call(s, u, **kw):
+        return {"status": "success", "content_blocks": []}
+
+    teaching_agent._call_llm_async = fake_call
+    lesson = asyncio.run(teaching_agent.generate_lesson_async(
+        topic="T", level="L", student_profile={},
+    ))
+    assert lesson["llm_response"]["status"] == "success"
+    assert lesson["rag_chunks_used"] == 3
+    assert teaching_agent.get_lesson_history()[-1] is lesson
+
+
+def test_export_lessons_writes_files(teaching_agent, tmp_path):
+    """export_lessons writes one JSON file per known id and skips the rest."""
+    teaching_agent._call_llm = lambda s, u, **kw: {"status": "success", "content_blocks": []}
+    lesson = teaching_agent.generate_lesson(topic="T", level="L", student_profile={})
+
+    paths = teaching_agent.export_lessons([lesson["lesson_id"], "missing"], str(tmp_path))
+    assert [os.path.basename(p) for p in paths] == [f"{lesson['lesson_id']}.json"]
+    assert json.loads((tmp_path / f"{lesson['lesson_id']}.json").read_text())["topic"] == "T"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_export_lessons_cleans_up_failed_write(monkeypatch, teaching_agent, tmp_path):
+    """A write that fails leaves no temp file behind and re-raises."""
+    teaching_agent._call_llm = lambda s, u, **kw: {"status": "success", "content_blocks": []}
+    lesson = teaching_agent.generate_lesson(topic="T", level="L", student_profile={})
+
+    def boom(obj):
+        raise OSError("disk full")
+    monkeypatch.setattr("agents.teaching_agent._json_dumps_indented", boom)
+
+    with pytest.raises(OSError):
+        teaching_agent.export_lessons([lesson["lesson_id"]], str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_lesson_history_is_bounded(monkeypatch):
+    """Past MAX_HISTORY the oldest lesson is dropped from history and index."""
+    monkeypatch.setattr(TeachingAgent, "MAX_HISTORY", 2)
+    agent = TeachingAgent(minimax_api_key="", rag_vectordb=None)
+    agent._call_llm = lambda s, u, **kw: {"status": "success", "content_blocks": []}
+    ids = [agent.generate_lesson(topic=f"T{i}", level="L", student_profile={})["lesson_id"]
+           for i in range(3)]
+
+    assert [l["lesson_id"] for l in agent.get_lesson_history()] == ids[1:]
+    assert agent.export_lesson(ids[0]) is None
+    assert agent.export_lesson(ids[2]) is not None
+
+
+def test_system_prompt_preamble_is_cacheable():
+    """The static preamble is split off and marked for prompt caching."""
+    from config.prompts import TEACHING_SYSTEM_PREAMBLE, cached_system, get_teaching_system_prompt
+
+    blocks = cached_system(get_teaching_system_prompt("Algebra", "advanced", {}))
+    assert blocks[0]["text"] == TEACHING_SYSTEM_PREAMBLE
+    assert blocks[0]["cache_control"] == {"type": "ephemeral"}
+    assert "Topic to Teach: Algebra" in blocks[1]["text"]
+    assert cached_system("plain prompt") == "plain prompt"
@@ -1,15 +1,24 @@
-"""Initialize utils module."""
-
-from utils.helpers import (
-    generate_session_id,
-    generate_entity_id,
-    save_json,
-    load_json,
-    calculate_percentage,
-    get_dse_level,
-    format_timestamp,
-    SessionManager
-)
+"""Initialize utils module.
+
+The helpers are imported lazily (PEP 562), so ``import utils.llm_json``
+does not also load ``utils.helpers`` (which configures logging).
+"""
+
+from importlib import import_module
+
+_LAZY = {
+    name: 'utils.helpers'
+    for name in (
+        'generate_session_id',
+        'generate_entity_id',
+        'save_json',
+        'load_json',
+        'calculate_percentage',
+        'get_dse_level',
+        'format_timestamp',
+        'SessionManager',
+    )
+}
 
 __all__ = [
     'generate_session_id',
@@ -21,3 +30,16 @@ __all__ = [
     'format_timestamp',
     'SessionManager'
 ]
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value  # cache: later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,7 +1,10 @@
 """Utility functions for EduLoop."""
 
 import json
-import uuid
+import os
+import tempfile
+import time
+from bisect import bisect_right
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 import logging
@@ -17,23 +20,36 @@ logger = logging.getLogger(__name__)
 
 def generate_session_id() -> str:
     """Generate unique session ID."""
-    return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+    return generate_entity_id("session")
 
 
 def generate_entity_id(prefix: str) -> str:
     """Generate unique entity ID with prefix."""
-    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
+    # Local-time stamp + 8 random hex chars, same shape as before
+    return f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{os.urandom(4).hex()}"
 
 
 def save_json(data: Dict[str, Any], filepath: str) -> bool:
-    """Save data as JSON file."""
+    """Save data as JSON file.
+
+    Written to a temp file in the same directory and renamed into place,
+    so readers never see a half-written file.
+    """
+    tmp_path = None
     try:
-        with open(filepath, 'w', encoding='utf-8') as f:
+        directory = os.path.dirname(os.path.abspath(filepath))
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False,
+        ) as f:
+            tmp_path = f.name
             json.dump(data, f, indent=2, ensure_ascii=False)
-        logger.info(f"Saved to {filepath}")
+        os.replace(tmp_path, filepath)
+        logger.info("Saved to %s", filepath)
         return True
     except Exception as e:
-        logger.error(f"Failed to save {filepath}: {str(e)}")
+        logger.error("Failed to save %s: %s", filepath, e)
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
         return False
 
 
@@ -42,10 +58,10 @@ def load_json(filepath: str) -> Optional[Dict[str, Any]]:
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        logger.info(f"Loaded from {filepath}")
+        logger.info("Loaded from %s", filepath)
         return data
     except Exception as e:
-        logger.error(f"Failed to load {filepath}: {str(e)}")
+        logger.error("Failed to load %s: %s", filepath, e)
         return None
 
 
@@ -56,22 +72,16 @@ def calculate_percentage(obtained: float, total: float) -> float:
     return (obtained / total) * 100
 
 
+# Lower bound (inclusive) of each HKDSE level above Level 1
+_DSE_LEVEL_THRESHOLDS = (40, 50, 60, 70, 80, 90)
+_DSE_LEVEL_LABELS = (
+    "Level 1", "Level 2", "Level 3", "Level 4", "Level 5", "Level 5*", "Level 5**",
+)
+
+
 def get_dse_level(percentage: float) -> str:
     """Map percentage to HKDSE level."""
-    if percentage >= 90:
-        return "Level 5**"
-    elif percentage >= 80:
-        return "Level 5*"
-    elif percentage >= 70:
-        return "Level 5"
-    elif percentage >= 60:
-        return "Level 4"
-    elif percentage >= 50:
-        return "Level 3"
-    elif percentage >= 40:
-        return "Level 2"
-    else:
-        return "Level 1"
+    return _DSE_LEVEL_LABELS[bisect_right(_DSE_LEVEL_THRESHOLDS, percentage)]
 
 
 def format_timestamp(iso_string: str) -> str:
@@ -120,19 +130,17 @@ class SessionManager:
     
     def delete_session(self, session_id: str) -> bool:
         """Delete session data."""
-        import os
         filepath = f"{self.session_dir}/{session_id}.json"
         try:
             os.remove(filepath)
-            logger.info(f"Deleted session {session_id}")
+            logger.info("Deleted session %s", session_id)
             return True
         except Exception as e:
-            logger.error(f"Failed to delete session {session_id}: {str(e)}")
+            logger.error("Failed to delete session %s: %s", session_id, e)
             return False
     
     def list_sessions(self) -> List[str]:
         """List all saved sessions."""
-        import os
         try:
             files = os.listdir(self.session_dir)
             return [f.replace('.json', '') for f in files if f.endswith('.json')]
@@ -142,5 +150,4 @@ class SessionManager:
     @staticmethod
     def _ensure_directory(path: str) -> None:
         """Ensure directory exists."""
-        import os
         os.makedirs(path, exist_ok=True)
@@ -0,0 +1,70 @@
+"""Extract JSON from LLM reply text.
+
+Shared by the MiniMax agents and the Bedrock orchestrator.  The models are
+asked for pure JSON but sometimes wrap it in markdown fences or add
+preamble/trailing text; these helpers recover the payload or return
+``None``.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+try:                                   # optional: faster JSON parsing
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+_RAW_DECODER = json.JSONDecoder()
+
+
+def _strip_fences(text: str) -> str:
+    text = text.lstrip("\ufeff").strip()
+    if text.startswith("```"):
+        first_nl = text.index("\n") if "\n" in text else 3
+        text = text[first_nl + 1:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+def safe_json_parse(text: str) -> Optional[Dict[str, Any]]:
+    """Try to extract a JSON object from an LLM response string."""
+    text = _strip_fences(text)
+    try:
+        return json_loads(text)
+    except json.JSONDecodeError:   # orjson's error subclasses this
+        start = text.find("{")
+        if start == -1:
+            return None
+        # Decode the first object in place — handles trailing chatter
+        # after the JSON without another scan of the reply
+        try:
+            parsed, _ = _RAW_DECODER.raw_decode(text, start)
+            return parsed
+        except json.JSONDecodeError:
+            pass
+        # Last resort: the span between the first '{' and last '}'
+        end = text.rfind("}")
+        if end > start:
+            try:
+                return json_loads(text[start : end + 1])
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def safe_json_array_parse(text: str) -> Optional[List[Any]]:
+    """Like ``safe_json_parse`` but for replies that should be a JSON array."""
+    text = _strip_fences(text)
+    start = text.find("[")
+    end = text.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        parsed = json_loads(text[start : end + 1])
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, list) else None